@@ -0,0 +1,292 @@
+from genomeio import parseWeights, iterBestGenomes
+from diversity import getDistanceFromSums
+
+import argparse, json, math, os, sys
+
+import numpy
+
+class GenerationStats(object):
+	"""
+	Statistics of one generation of one execution, accumulated one individual at a time
+
+	The diversity is the rms per-weight distance, the root mean square distance per
+	weight between every pair of genomes, the one of DiversityMonitor, which only
+	needs the sum of the genomes and the sum of their squared norms. It is not the
+	mean Euclidean distance between genomes, which can not be streamed this way
+
+	Attributes:
+	    executionId (str): Id of the execution
+	    generation (int): Number of the generation
+	    count (int): Number of individuals
+	    scoreSum (float): Sum of the scores
+	    scoreSquaredSum (float): Sum of the squared scores
+	    minScore (float): Lowest score
+	    maxScore (float): Highest score
+	    histogram (dict): Maps a score to the number of individuals with that score
+	    weightSum (numpy.ndarray): Sum of the genomes, None if the diversity is not computed
+	    weightSquaredNormSum (float): Sum of the squared norms of the genomes
+
+	"""
+	def __init__(self, executionId, generation):
+		"""
+		Initialize
+
+		Args:
+		    executionId (str): Id of the execution
+		    generation (int): Number of the generation
+		"""
+		self.executionId = executionId
+		self.generation = generation
+		self.count = 0
+		self.scoreSum = 0.0
+		self.scoreSquaredSum = 0.0
+		self.minScore = None
+		self.maxScore = None
+		self.histogram = {}
+		self.weightSum = None
+		self.weightSquaredNormSum = 0.0
+
+	def add(self, score, weights = None):
+		"""
+		Add an individual
+
+		Args:
+		    score (float): Score of the individual
+		    weights (numpy.ndarray, optional): Genome of the individual, needed for the diversity
+		"""
+		self.count += 1
+		self.scoreSum += score
+		self.scoreSquaredSum += score*score
+		self.minScore = score if self.minScore is None else min(self.minScore, score)
+		self.maxScore = score if self.maxScore is None else max(self.maxScore, score)
+		self.histogram[score] = self.histogram.get(score, 0) + 1
+
+		if weights is not None:
+			if self.weightSum is None:
+				self.weightSum = numpy.zeros(len(weights))
+			self.weightSum += weights
+			self.weightSquaredNormSum += numpy.dot(weights, weights)
+
+	def getMean(self):
+		"""
+		Returns the average score
+
+		Returns:
+		    float: Average score
+		"""
+		return self.scoreSum/self.count
+
+	def getStd(self):
+		"""
+		Returns the standard deviation of the scores
+
+		Returns:
+		    float: Standard deviation
+		"""
+		return math.sqrt(max(0.0, self.scoreSquaredSum/self.count - self.getMean()**2))
+
+	def getMedian(self):
+		"""
+		Returns the median score, from the histogram
+
+		Returns:
+		    float: Median score
+		"""
+		seen = 0
+		for score in sorted(self.histogram):
+			seen += self.histogram[score]
+			if seen*2 >= self.count:
+				return score
+
+	def getDiversity(self):
+		"""
+		Returns the root mean square distance per weight between pairs of genomes
+
+		Returns:
+		    float: The diversity, None if it was not computed
+		"""
+		if self.weightSum is None or self.count < 2:
+			return None
+		return getDistanceFromSums(self.count, self.weightSum, self.weightSquaredNormSum)
+
+	def toDict(self):
+		"""
+		Returns the statistics as a JSON serializable dict
+
+		Returns:
+		    dict: The statistics
+		"""
+		diversity = self.getDiversity()
+		return {
+			"executionId": self.executionId,
+			"generation": self.generation,
+			"count": self.count,
+			"mean": round(self.getMean(), 4),
+			"std": round(self.getStd(), 4),
+			"min": self.minScore,
+			"median": self.getMedian(),
+			"max": self.maxScore,
+			"rmsWeightDistance": None if diversity is None else round(diversity, 4),
+			"histogram": dict((str(score), count) for score, count in sorted(self.histogram.items())),
+		}
+
+def iterGenerationStats(filename, diversity = True):
+	"""
+	Stream the statistics of each generation of a ./stats/<executionId>.txt file,
+	only the current generation is kept in memory
+
+	Args:
+	    filename (str): Path of the file
+	    diversity (bool, optional): Parse the weights to compute the diversity, it is slower
+
+	Yields:
+	    GenerationStats: The statistics of each generation, in the order of the file
+	"""
+	executionId = os.path.splitext(os.path.basename(filename))[0]
+	stats = None
+	with open(filename) as fh:
+		for line in fh:
+			if not line.strip():
+				continue
+			generation, score, weights = line.split(";", 2)
+			generation = int(generation)
+			if stats is None or stats.generation != generation:
+				if stats is not None:
+					yield stats
+				stats = GenerationStats(executionId, generation)
+			stats.add(float(score), numpy.array(parseWeights(weights)) if diversity else None)
+	if stats is not None:
+		yield stats
+
+class ConvergenceCurve(object):
+	"""
+	Average of the per generation statistics of many executions
+
+	Attributes:
+	    columns (list): Columns of the rows
+
+	    generations (dict): Maps a generation to its accumulated values
+
+	"""
+	columns = ["generation", "runs", "meanOfMeans", "meanOfMaxes", "max", "meanRmsWeightDistance"]
+
+	def __init__(self):
+		"""
+		Initialize
+		"""
+		self.generations = {}
+
+	def add(self, stats):
+		"""
+		Add a generation of an execution
+
+		Args:
+		    stats (GenerationStats): The statistics of the generation
+		"""
+		runs, meanSum, maxSum, maxScore, diversitySum, diversityRuns = self.generations.get(stats.generation, (0, 0.0, 0.0, None, 0.0, 0))
+		diversity = stats.getDiversity()
+		self.generations[stats.generation] = (runs + 1, meanSum + stats.getMean(), maxSum + stats.maxScore,
+			stats.maxScore if maxScore is None else max(maxScore, stats.maxScore),
+			diversitySum + (diversity or 0.0), diversityRuns + (diversity is not None))
+
+	def iterRows(self):
+		"""
+		Returns the curve
+
+		Yields:
+		    dict: The values of each generation, in order
+		"""
+		for generation in sorted(self.generations):
+			runs, meanSum, maxSum, maxScore, diversitySum, diversityRuns = self.generations[generation]
+			yield {
+				"generation": generation,
+				"runs": runs,
+				"meanOfMeans": round(meanSum/runs, 4),
+				"meanOfMaxes": round(maxSum/runs, 4),
+				"max": maxScore,
+				"meanRmsWeightDistance": round(diversitySum/diversityRuns, 4) if diversityRuns else None,
+			}
+
+def summarizeBestGenomes(filename):
+	"""
+	Summarize a bestGenomes.txt file, streaming it
+
+	Args:
+	    filename (str): Path of the file
+
+	Returns:
+	    list: A dict per execution with its number of entries and best score, best first
+	"""
+	executions = {}
+	for score, executionId, weights in iterBestGenomes(filename):
+		entries, bestScore = executions.get(executionId, (0, None))
+		executions[executionId] = (entries + 1, score if bestScore is None else max(bestScore, score))
+	rows = [{"executionId": executionId, "entries": entries, "bestScore": bestScore} for executionId, (entries, bestScore) in executions.items()]
+	return sorted(rows, key = lambda row: -row["bestScore"])
+
+def writeRows(rows, columns, outputFormat, fh):
+	"""
+	Write rows as CSV or JSON lines, as they come
+
+	Args:
+	    rows (iterable): dicts
+	    columns (list): Columns of the CSV
+	    outputFormat (str): 'csv' or 'json'
+	    fh (file): Output file
+	"""
+	if outputFormat == 'csv':
+		fh.write(",".join(columns) + "\n")
+	for row in rows:
+		if outputFormat == 'csv':
+			values = []
+			for column in columns:
+				value = row[column]
+				if isinstance(value, dict):
+					value = " ".join(key + ":" + str(count) for key, count in value.items())
+				values.append("" if value is None else str(value))
+			fh.write(",".join(values) + "\n")
+		else:
+			fh.write(json.dumps(row, sort_keys = True) + "\n")
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Streaming statistics of stats files and bestGenomes.txt")
+	parser.add_argument("files", nargs = "+", help = "stats files, or directories with stats files, or bestGenomes.txt with --best-genomes")
+	parser.add_argument("--mode", choices = ("generations", "curve"), default = "generations",
+		help = "one row per generation of each execution, or one row per generation averaged over the executions (default: generations)")
+	parser.add_argument("--best-genomes", action = "store_true", help = "the files are bestGenomes.txt files, summarize each execution")
+	parser.add_argument("--no-diversity", action = "store_true", help = "do not parse the weights nor compute the rms per-weight distance, faster")
+	parser.add_argument("--format", choices = ("csv", "json"), default = "csv", help = "CSV or JSON lines (default: csv)")
+	parser.add_argument("--output", help = "output file (default: standard output)")
+	args = parser.parse_args()
+
+	output = open(args.output, "w") if args.output else sys.stdout
+
+	if args.best_genomes:
+		rows = []
+		for filename in args.files:
+			rows += summarizeBestGenomes(filename)
+		writeRows(rows, ["executionId", "entries", "bestScore"], args.format, output)
+	else:
+		filenames = []
+		for path in args.files:
+			if os.path.isdir(path):
+				filenames += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".txt"))
+			else:
+				filenames.append(path)
+
+		def iterAllStats():
+			for filename in filenames:
+				for stats in iterGenerationStats(filename, not args.no_diversity):
+					yield stats
+
+		if args.mode == "generations":
+			writeRows((stats.toDict() for stats in iterAllStats()),
+				["executionId", "generation", "count", "mean", "std", "min", "median", "max", "rmsWeightDistance", "histogram"], args.format, output)
+		else:
+			curve = ConvergenceCurve()
+			for stats in iterAllStats():
+				curve.add(stats)
+			writeRows(curve.iterRows(), ConvergenceCurve.columns, args.format, output)
+
+	if args.output:
+		output.close()
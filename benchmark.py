@@ -0,0 +1,101 @@
+from config import Config
+from evolution import HeadlessTrainer
+
+import argparse, itertools, multiprocessing, random, sys, time
+
+import numpy
+
+def runTrial(task):
+	"""
+	Evolve a headless population until it reaches the target score, pool worker
+
+	Args:
+	    task (tuple): (options, seed, targetScore)
+
+	Returns:
+	    tuple: (generation that reached the target or None, seconds)
+	"""
+	options, seed, targetScore = task
+	config = Config(**options)
+	config.set("headless", True)
+	config.set("seed", seed)
+	random.seed(seed)
+	numpy.random.seed(seed)
+
+	start = time.time()
+	trainer = HeadlessTrainer(config)
+	generation = trainer.run(targetScore)
+	trainer.close()
+	return (generation, time.time() - start)
+
+def getMedian(values):
+	"""
+	Returns the median of a list
+
+	Args:
+	    values (list): Numbers
+
+	Returns:
+	    float: The median, None if the list is empty
+	"""
+	if not values:
+		return None
+	values = sorted(values)
+	middle = len(values)//2
+	return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle])/2.0
+
+def summarizeTrials(trials):
+	"""
+	Summarize the trials of a strategy, the failed ones count as not reaching the target
+
+	Args:
+	    trials (list): (generation or None, seconds) of each trial
+
+	Returns:
+	    dict: Number of trials and successes, and the median generations and seconds of the successes
+	"""
+	successes = [(generation, seconds) for generation, seconds in trials if generation is not None]
+	medianGenerations = getMedian([generation for generation, seconds in successes])
+	medianSeconds = getMedian([seconds for generation, seconds in successes])
+	return {
+		"trials": len(trials),
+		"successes": len(successes),
+		"medianGenerations": medianGenerations,
+		"medianSeconds": round(medianSeconds, 3) if medianSeconds is not None else None,
+		"totalSeconds": round(sum(seconds for generation, seconds in trials), 3),
+	}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Compare the time that each selection and replacement takes to reach a target score on the headless engine")
+	parser.add_argument("--selectors", default = "roulette,proportional,tournament,rank,truncation", help = "comma separated selections (default: all)")
+	parser.add_argument("--replace-numbers", default = "0", help = "comma separated replaceNumber values, 0 is generational (default: 0)")
+	parser.add_argument("--target", type = float, default = 2.0, help = "average carrots eaten by a generation to reach (default: 2)")
+	parser.add_argument("--repeats", type = int, default = 5, help = "trials of each strategy, trial i uses seed i + 1 for all of them (default: 5)")
+	parser.add_argument("--jobs", type = int, default = multiprocessing.cpu_count(), help = "number of processes (default: number of CPUs)")
+	parser.add_argument("--config", metavar = "FILE", help = "JSON file with the options of the runs")
+	parser.add_argument("--set", action = "append", default = [], metavar = "NAME=VALUE", help = "override an option, can be repeated")
+	args = parser.parse_args()
+
+	config = Config.load(args.config) if args.config else Config()
+	config.override(args.set)
+
+	strategies = list(itertools.product(args.selectors.split(","), [int(value) for value in args.replace_numbers.split(",")]))
+	tasks = []
+	for selector, replaceNumber in strategies:
+		options = config.toDict()
+		options.update(selector = selector, replaceNumber = replaceNumber)
+		Config(**options) #fail before launching anything if an option is wrong
+		tasks += [(options, repeat + 1, args.target) for repeat in range(args.repeats)]
+
+	if args.jobs > 1 and config.evaluationJobs == 1: #the trials can not have their own pools inside the pool
+		pool = multiprocessing.Pool(args.jobs)
+		results = pool.map(runTrial, tasks, chunksize = 1)
+		pool.close()
+	else:
+		results = [runTrial(task) for task in tasks]
+
+	columns = ["trials", "successes", "medianGenerations", "medianSeconds", "totalSeconds"]
+	sys.stdout.write(",".join(["selector", "replaceNumber"] + columns) + "\n")
+	for i, (selector, replaceNumber) in enumerate(strategies):
+		summary = summarizeTrials(results[i*args.repeats:(i + 1)*args.repeats])
+		sys.stdout.write(",".join([selector, str(replaceNumber)] + ["" if summary[column] is None else str(summary[column]) for column in columns]) + "\n")
@@ -0,0 +1,85 @@
+import numpy
+
+class Brain(object):
+	"""
+	Fully connected feed forward neural network with hyperbolic tangent activations.
+
+	It reproduces the PyBrain network the pandas used to build (a chain of TanhLayer
+	modules joined by FullConnection objects without bias units), including the tanh
+	applied by the input layer, but stores the weights and computes the activations
+	with a selectable floating point precision.
+
+	Attributes:
+	    precisions (tuple): Names of the supported numpy floating point types
+
+	    topology (tuple): Number of neurons of each layer, inputs first
+	    dtype (numpy.dtype): Floating point type of the weights and activations
+	    weightMatrices (list): One (outputs, inputs) matrix per connection
+
+	"""
+	precisions = ('float32', 'float64')
+
+	def __init__(self, weights, topology = (14, 12, 6, 2), precision = 'float64'):
+		"""
+		Initialize
+
+		Args:
+		    weights (list): Flat list of weights, in PyBrain's parameter order
+		    topology (tuple, optional): Number of neurons of each layer
+		    precision (str, optional): 'float32' or 'float64'
+		"""
+		self.topology = tuple(topology)
+		self.dtype = Brain.getDtype(precision)
+
+		weights = numpy.asarray(weights, dtype = self.dtype)
+		if weights.shape != (Brain.getNumWeights(self.topology),):
+			raise ValueError("Expected %d weights for topology %s, got %s" % (Brain.getNumWeights(self.topology), str(self.topology), str(weights.shape)))
+
+		self.weightMatrices = []
+		index = 0
+		for inputs, outputs in zip(self.topology[:-1], self.topology[1:]):
+			self.weightMatrices.append(weights[index:index + inputs*outputs].reshape(outputs, inputs))
+			index += inputs*outputs
+
+	def activate(self, inputs):
+		"""
+		Propagate the inputs through the network
+
+		Args:
+		    inputs (list): One value per input neuron
+
+		Returns:
+		    numpy.ndarray: Activations of the output layer
+		"""
+		activation = numpy.tanh(numpy.asarray(inputs, dtype = self.dtype))
+		for matrix in self.weightMatrices:
+			activation = numpy.tanh(numpy.dot(matrix, activation))
+		return activation
+
+	@staticmethod
+	def getNumWeights(topology):
+		"""
+		Returns the number of weights needed by a topology
+
+		Args:
+		    topology (tuple): Number of neurons of each layer
+
+		Returns:
+		    int: Number of weights
+		"""
+		return sum(inputs*outputs for inputs, outputs in zip(topology[:-1], topology[1:]))
+
+	@staticmethod
+	def getDtype(precision):
+		"""
+		Validate a precision name
+
+		Args:
+		    precision (str): 'float32' or 'float64'
+
+		Returns:
+		    numpy.dtype: The numpy type for that precision
+		"""
+		if precision not in Brain.precisions:
+			raise ValueError("Unknown precision '%s', expected one of %s" % (precision, ", ".join(Brain.precisions)))
+		return numpy.dtype(precision)
@@ -1,6 +1,5 @@
 from direct.task import Task
-from panda3d.core import Point3
-from random import randrange
+import layout
 
 class Carrot(object):
 	"""
@@ -12,6 +11,8 @@ class Carrot(object):
 
 	    carrotHandle (NodePath): Panda3D Node for the carrot
 	    isActive (bool): True if the carrot is ready to be eaten
+	    ascendStartTick (int): Tick when the carrot was eaten, None if it is not going up
+	    ascendStartZ (float): z coordinate where it started going up
 	    
 	"""
 	carrotList = []
@@ -31,6 +32,8 @@ class Carrot(object):
 			Carrot.carrotModel.setPos(0,0,0)
 
 		self.isActive = True
+		self.ascendStartTick = None
+		self.ascendStartZ = 0.0
 
 		self.carrotHandle = game.render.attachNewNode("carrotHandle")
   		self.carrotHandle.setPos(x, y, 1.5)
@@ -59,51 +62,19 @@ class Carrot(object):
 		    pandas (list): List of pandas
 		    spikes (list): List of spikes
 		"""
-		colisionDetected = True
-		carrotPoint = None
-		while(colisionDetected):
-			colisionDetected = False
-			x = randrange(50 - game.gameWidth/2, -50 + game.gameWidth/2)
-			y = randrange(50 - game.gameHeight/2, -50 + game.gameHeight/2)
-			carrotPoint = Point3(x, y, 1.5)
-
-			for panda in pandas:
-				if panda.isDying:
-					continue
-				
-				point = panda.pandaHandle.getPos(game.render)
-				dist = (point.getXy() - carrotPoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-			if colisionDetected:
-				continue
-
-			for spike in spikes:
-				point = spike.spikeHandle.getPos(game.render)
-				dist = (point.getXy() - carrotPoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-			if colisionDetected:
-				continue
-
-			for carrot in Carrot.carrotList:
-				if not carrot.isActive:
-					continue
-
-				point = carrot.carrotHandle.getPos(game.render)
-				dist = (point.getXy() - carrotPoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-
-		self.carrotHandle.setPos(carrotPoint)
+		pandaPositions = [(panda.pandaHandle.getX(game.render), panda.pandaHandle.getY(game.render)) for panda in pandas if not panda.isDying]
+		spikePositions = [(spike.spikeHandle.getX(game.render), spike.spikeHandle.getY(game.render)) for spike in spikes]
+		carrotPositions = [(carrot.carrotHandle.getX(game.render), carrot.carrotHandle.getY(game.render)) for carrot in Carrot.carrotList if carrot.isActive]
+		x, y = layout.findCarrotPosition(game.rng, game.gameWidth, game.gameHeight, pandaPositions, spikePositions, carrotPositions)
+
+		self.carrotHandle.setPos(x, y, 1.5)
 		self.isActive = True
+		self.ascendStartTick = None
 
 	def goToHeaven(self, game, pandas, spikes):
 		"""
-		When the carrot is eaten this method is called, it shows an animation and then reposition it
+		When the carrot is eaten this method is called, it goes up, unless headless, and
+		then it is repositioned
 		
 		Args:
 		    game (Game): A reference to the Game object
@@ -116,18 +87,20 @@ class Carrot(object):
 		if not self.isActive:
 			return
 		self.isActive = False
-		pos = self.carrotHandle.getPos()
-		goToHeavenInterval = self.carrotHandle.posInterval(2, Point3(pos.getX(), pos.getY(), 40))
-		goToHeavenInterval.start()
+		if not game.headless:
+			self.ascendStartTick = game.scheduler.currentTick
+			self.ascendStartZ = self.carrotHandle.getZ()
 
-		game.taskMgr.doMethodLater(2.5, self.reposition, 'reset carrot', extraArgs = [game, pandas, spikes])
+		game.scheduler.schedule(game.options.carrotRespawnTicks, self.reposition, 'reset carrot', [game, pandas, spikes])
 
 	@staticmethod
-	def spinCarrots(task):
+	def spinCarrots(game, task):
 		"""
-		A visual effect for spining the carrots
+		A visual effect for spining the carrots, the eaten ones go up to z = 40 in
+		game.options.carrotAscendTicks ticks
 		
 		Args:
+		    game (Game): A reference to the Game object
 		    task (task): Panda3D requires this param
 		
 		Returns:
@@ -135,8 +108,12 @@ class Carrot(object):
 		"""
 		angleDegrees = task.time * 45.0
 
+		ascendTicks = game.options.carrotAscendTicks
 		for carrot in Carrot.carrotList:
 			carrot.carrotHandle.setHpr(angleDegrees, 45, 0)
+			if carrot.ascendStartTick is not None:
+				tick = min(game.scheduler.currentTick - carrot.ascendStartTick + 1, ascendTicks)
+				carrot.carrotHandle.setZ(carrot.ascendStartZ + (40.0 - carrot.ascendStartZ)*tick/ascendTicks)
 		return Task.cont
 
 	@staticmethod
@@ -147,7 +124,7 @@ class Carrot(object):
 		Args:
 		    game (Game): A reference to the Game object
 		"""
-		game.taskMgr.remove('reset carrot')
+		game.scheduler.cancel('reset carrot')
 
 		for carrot in Carrot.carrotList[:]:
 			carrot.__delete()
\ No newline at end of file
@@ -0,0 +1,270 @@
+import json
+from math import sqrt
+
+from brain import Brain
+from selection import selectorNames
+
+def parseBool(value):
+	"""
+	Convert a JSON or command line value to bool
+
+	Args:
+	    value (bool or str): True, False, "true", "false", "1", "0", "yes" or "no"
+
+	Returns:
+	    bool: The value
+	"""
+	if isinstance(value, bool):
+		return value
+	if str(value).lower() in ("true", "1", "yes"):
+		return True
+	if str(value).lower() in ("false", "0", "no"):
+		return False
+	raise ValueError("Expected a boolean, got '%s'" % str(value))
+
+def parseIntTuple(value):
+	"""
+	Convert a JSON or command line value to a tuple of ints
+
+	Args:
+	    value (list or str): [12, 6] or "12,6"
+
+	Returns:
+	    tuple: The value
+	"""
+	if isinstance(value, (list, tuple)):
+		return tuple(int(item) for item in value)
+	return tuple(int(item) for item in str(value).split(",") if item.strip())
+
+def parseStringList(value):
+	"""
+	Convert a JSON or command line value to a list of strings
+
+	Args:
+	    value (list or str): ["a", "b"] or "a,b"
+
+	Returns:
+	    list: The value
+	"""
+	if isinstance(value, (list, tuple)):
+		return [str(item) for item in value]
+	return [item for item in str(value).split(",") if item]
+
+def parsePrecision(value):
+	"""
+	Convert a JSON or command line value to a precision name
+
+	Args:
+	    value (str): 'auto', 'float32' or 'float64'
+
+	Returns:
+	    str: The value
+	"""
+	if value != 'auto':
+		Brain.getDtype(value)
+	return str(value)
+
+def parseSelector(value):
+	"""
+	Convert a JSON or command line value to a selection name
+
+	Args:
+	    value (str): One of selection.selectorNames
+
+	Returns:
+	    str: The value
+	"""
+	if value not in selectorNames:
+		raise ValueError("Unknown selection '%s', expected one of %s" % (value, ", ".join(selectorNames)))
+	return str(value)
+
+class Config(object):
+	"""
+	Typed configuration of a run, it replaces the constants that were hard coded in
+	Game and Panda. The values are read from a JSON file and can be overridden one
+	by one with "name=value" strings, as main.py does with --set.
+
+	Attributes:
+	    fields (list): (name, parser, default, description) of every option
+
+	"""
+	fields = [
+		('gameWidth', int, 164, "Width of the world geometry OX plane"),
+		('gameHeight', int, 164, "Height of the world geometry OY plane"),
+		('pandaNumber', int, 8, "Number of pandas, it is the population size"),
+		('carrotNumber', int, 16, "Number of carrots"),
+		('spikeNumber', int, 8, "Number of spikes"),
+		('maxFramesPerGeneration', int, 1024, "Maximum number of frames per generation"),
+		('maxGenerations', int, 32, "Maximum number of generations before exiting"),
+		('carrotRespawnTicks', int, 150, "Ticks until an eaten carrot appears in another position"),
+		('carrotAscendTicks', int, 120, "Ticks of the animation of an eaten carrot"),
+		('dyingTicks', int, 180, "Ticks until a dead panda is removed"),
+		('mutationRate', float, 0.05, "Mutation rate of the genetic algorithm"),
+		('mutationSigma', float, 1.0, "Standard deviation of the gaussian mutation"),
+		('diversityThreshold', float, 0.5, "Root mean square distance per weight between genomes below which the population is collapsed"),
+		('mutationBoost', float, 2.0, "Multiplier of the mutation rate and sigma per collapsed generation"),
+		('maxMutationBoost', float, 8.0, "Maximum multiplier of the mutation rate and sigma"),
+		('collapsePatience', int, 5, "Collapsed generations with a low average score before the run is terminated, 0 to never terminate"),
+		('hopelessAvgScore', float, 0.5, "Average score below which a collapsed run is terminated"),
+		('selector', parseSelector, 'roulette', "Parent selection: 'roulette' (PyEvolve's, on the scaled fitness), 'proportional' (to the raw score), 'tournament', 'rank' or 'truncation'"),
+		('tournamentSize', int, 3, "Individuals per tournament of the tournament selection"),
+		('rankPressure', float, 1.7, "Between 1 and 2, times the average that the best individual is selected by the rank selection"),
+		('truncationFraction', float, 0.5, "Fraction of the best individuals that the truncation selection picks from"),
+		('replaceNumber', int, 0, "Individuals replaced by offspring each generation keeping the best ones (steady-state), 0 to replace the whole population"),
+		('weightRange', float, 3.0, "Initial weights are uniformly chosen in [-weightRange, weightRange]"),
+
+		('viewDistance', float, 50.0, "Maximum view distance of a panda"),
+		('baseSpeed', float, 1.0, "Speed multiplier of a panda, at most 1.58 so a step is shorter than the reach of a carrot"),
+		('baseTurnSpeed', float, 10.0, "Turn speed multiplier of a panda (in degrees)"),
+		('frustumNumber', int, 7, "Number of view frustums, each one is 2 inputs of the net"),
+		('hiddenLayers', parseIntTuple, (12, 6), "Number of neurons of each hidden layer"),
+
+		('seed', int, 0, "Seed of the random positions of the world, 0 for a random seed"),
+		('headless', parseBool, False, "Run without a window, UI or visual effects"),
+		('ticksPerStep', int, 1, "Ticks simulated with one decision of each panda by the headless world, with swept collisions along the longer moves, 1 to decide every tick"),
+		('batchPandas', parseBool, False, "Update every panda of the headless world at once each tick with the nets evaluated in one batch, False to follow the per frame rules exactly"),
+		('scenariosPerGeneration', int, 1, "Worlds each generation is simulated in by the headless trainer, the fitness is the average"),
+		('evaluationJobs', int, 1, "Processes that simulate the worlds of a generation in the headless trainer"),
+		('hudRefreshRate', float, 10.0, "Maximum number of times per second the UI text is refreshed, 0 for every frame"),
+		('statsDirectory', str, "./stats", "Directory of the population statistics of each execution"),
+		('archiveDirectory', str, "", "Directory of the memory mapped archive of every genome of each execution, empty to disable it"),
+		('hallOfFameFile', str, "hallOfFame.db", "SQLite database of the best genome of every generation, shared by the executions"),
+		('precision', parsePrecision, 'auto', "'float32', 'float64' or 'auto' for float32 only when headless"),
+		('seedSources', parseStringList, [], "hallOfFame.db, bestGenomes.txt, stats or .archive.json files to seed the initial population from"),
+		('seedFraction', float, 0.5, "Fraction of the initial population seeded from seedSources"),
+		('seedJitter', float, 0.0, "Standard deviation of the gaussian noise added to the seeds"),
+	]
+
+	def __init__(self, **values):
+		"""
+		Initialize with the default values
+
+		Args:
+		    **values: Values that replace the defaults
+		"""
+		for name, parser, default, description in Config.fields:
+			setattr(self, name, parser(default))
+		for name, value in values.items():
+			self.set(name, value)
+		self.validate()
+
+	def set(self, name, value):
+		"""
+		Convert and set an option
+
+		Args:
+		    name (str): Name of the option
+		    value: Value, a string is converted to the type of the option
+		"""
+		for fieldName, parser, default, description in Config.fields:
+			if fieldName == name:
+				setattr(self, name, parser(value))
+				return
+		raise KeyError("Unknown option '%s'" % name)
+
+	def override(self, assignments):
+		"""
+		Apply "name=value" overrides and validate the result
+
+		Args:
+		    assignments (list): Strings like "pandaNumber=32"
+		"""
+		for assignment in assignments:
+			if "=" not in assignment:
+				raise ValueError("Expected name=value, got '%s'" % assignment)
+			name, value = assignment.split("=", 1)
+			self.set(name.strip(), value.strip())
+		self.validate()
+
+	def validate(self):
+		"""
+		Check that the values are consistent
+		"""
+		for name in ('gameWidth', 'gameHeight', 'pandaNumber', 'maxFramesPerGeneration', 'carrotAscendTicks', 'frustumNumber', 'viewDistance', 'ticksPerStep', 'scenariosPerGeneration', 'evaluationJobs'):
+			if getattr(self, name) <= 0:
+				raise ValueError("%s must be positive" % name)
+		for name in ('carrotNumber', 'spikeNumber', 'maxGenerations', 'carrotRespawnTicks', 'dyingTicks', 'mutationRate', 'mutationSigma', 'diversityThreshold', 'collapsePatience', 'replaceNumber', 'hudRefreshRate', 'seedJitter'):
+			if getattr(self, name) < 0:
+				raise ValueError("%s can not be negative" % name)
+		if not 0.0 < 2.0*self.baseSpeed <= sqrt(10):
+			raise ValueError("baseSpeed must be positive and at most %.2f, a panda steps up to 2*baseSpeed per tick and could step over a carrot (reach sqrt(10))" % (sqrt(10)/2.0))
+		if any(neurons <= 0 for neurons in self.hiddenLayers):
+			raise ValueError("hiddenLayers must be positive")
+		if self.mutationBoost < 1.0 or self.maxMutationBoost < 1.0:
+			raise ValueError("mutationBoost and maxMutationBoost must be at least 1")
+		if self.tournamentSize < 1:
+			raise ValueError("tournamentSize must be at least 1")
+		if not 1.0 <= self.rankPressure <= 2.0:
+			raise ValueError("rankPressure must be between 1 and 2")
+		if not 0.0 < self.truncationFraction <= 1.0:
+			raise ValueError("truncationFraction must be greater than 0 and at most 1")
+		if not 0.0 <= self.seedFraction <= 1.0:
+			raise ValueError("seedFraction must be between 0 and 1")
+
+	@property
+	def topology(self):
+		"""
+		Number of neurons of each layer of the net, 2 inputs per frustum and 2 outputs (turn and speed)
+
+		Returns:
+		    tuple: The topology, inputs first
+		"""
+		return (self.frustumNumber*2,) + tuple(self.hiddenLayers) + (2,)
+
+	@property
+	def numNeurons(self):
+		"""
+		Number of weights of the net, it is the length of the genome
+
+		Returns:
+		    int: Number of weights
+		"""
+		return Brain.getNumWeights(self.topology)
+
+	def getPrecision(self):
+		"""
+		Resolve the 'auto' precision
+
+		Returns:
+		    str: 'float32' or 'float64'
+		"""
+		if self.precision == 'auto':
+			return 'float32' if self.headless else 'float64'
+		return self.precision
+
+	def toDict(self):
+		"""
+		Returns the options as a JSON serializable dict
+
+		Returns:
+		    dict: Maps the name of every option to its value
+		"""
+		values = {}
+		for name, parser, default, description in Config.fields:
+			value = getattr(self, name)
+			values[name] = list(value) if isinstance(value, tuple) else value
+		return values
+
+	def save(self, filename):
+		"""
+		Save the options to a JSON file
+
+		Args:
+		    filename (str): Path of the file
+		"""
+		with open(filename, "w") as fh:
+			json.dump(self.toDict(), fh, indent = 4, sort_keys = True)
+
+	@staticmethod
+	def load(filename):
+		"""
+		Load the options of a JSON file, missing options keep their default value
+
+		Args:
+		    filename (str): Path of the file
+
+		Returns:
+		    Config: The configuration
+		"""
+		with open(filename) as fh:
+			return Config(**json.load(fh))
@@ -0,0 +1,127 @@
+import numpy
+
+def getDistanceFromSums(count, weightSum, squaredNormSum):
+	"""
+	Root mean square distance between every pair of genomes, per weight, from the
+	sum of the genomes and the sum of their squared norms, without building the
+	pairs: sum over pairs of |a - b|^2 = n * sum |a|^2 - |sum a|^2
+
+	Args:
+	    count (int): Number of genomes
+	    weightSum (numpy.ndarray): Sum of the genomes
+	    squaredNormSum (float): Sum of the squared norms of the genomes
+
+	Returns:
+	    float: The distance, 0 if there are less than 2 genomes
+	"""
+	if count < 2:
+		return 0.0
+	pairSum = count*squaredNormSum - numpy.dot(weightSum, weightSum)
+	return float(numpy.sqrt(max(0.0, pairSum/(count*(count - 1)/2.0)/len(weightSum))))
+
+def getPairwiseDistance(genomeMatrix):
+	"""
+	Root mean square distance between every pair of genomes, per weight
+
+	Args:
+	    genomeMatrix (numpy.ndarray): (individuals, weights) array
+
+	Returns:
+	    float: The distance, 0 if there are less than 2 genomes
+	"""
+	genomeMatrix = numpy.asarray(genomeMatrix, dtype = numpy.float64)
+	return getDistanceFromSums(len(genomeMatrix), genomeMatrix.sum(axis = 0), numpy.einsum('ij,ij->', genomeMatrix, genomeMatrix))
+
+class DiversityMonitor(object):
+	"""
+	Watches the diversity of the population each generation. While it is below a
+	threshold the mutation rate and the gaussian sigma are multiplied by a growing
+	factor, and while it is above the factor is divided by the same amount each
+	generation, down to 1. A run whose diversity stays collapsed for some generations
+	while its average score is low is declared hopeless, so it can be terminated
+	instead of wasting more generations.
+
+	Attributes:
+	    ga (GSimpleGA): PyEvolve's Genetic Algorithm object
+	    baseMutationRate (float): Mutation rate when the population is diverse
+	    baseSigma (float): Standard deviation of the gaussian mutation when the population is diverse
+	    threshold (float): Diversity below which the population is collapsed
+	    boost (float): Multiplier of the mutation factor per collapsed generation
+	    maxBoost (float): Maximum mutation factor
+	    patience (int): Collapsed generations before a run with a low score is hopeless
+	    hopelessAvgScore (float): Average score below which a collapsed run is hopeless
+	    mutationFactor (float): Current multiplier of the mutation rate and sigma
+	    collapsedGenerations (int): Number of consecutive collapsed generations
+	    history (list): (generation, pairwise distance, mutation factor) of each generation
+
+	"""
+	def __init__(self, ga, baseMutationRate, baseSigma, threshold, boost = 2.0, maxBoost = 8.0, patience = 5, hopelessAvgScore = 0.5):
+		"""
+		Initialize
+
+		Args:
+		    ga (GSimpleGA): PyEvolve's Genetic Algorithm object
+		    baseMutationRate (float): Mutation rate when the population is diverse
+		    baseSigma (float): Standard deviation of the gaussian mutation when the population is diverse
+		    threshold (float): Pairwise distance per weight below which the population is collapsed
+		    boost (float, optional): Multiplier of the mutation factor per collapsed generation
+		    maxBoost (float, optional): Maximum mutation factor
+		    patience (int, optional): Collapsed generations before a run with a low score is hopeless, 0 to never terminate
+		    hopelessAvgScore (float, optional): Average score below which a collapsed run is hopeless
+		"""
+		self.ga = ga
+		self.baseMutationRate = baseMutationRate
+		self.baseSigma = baseSigma
+		self.threshold = threshold
+		self.boost = boost
+		self.maxBoost = maxBoost
+		self.patience = patience
+		self.hopelessAvgScore = hopelessAvgScore
+		self.mutationFactor = 1.0
+		self.collapsedGenerations = 0
+		self.history = []
+
+	def update(self, generation, genomeMatrix, avgScore):
+		"""
+		Measure the population that has just been evaluated and adapt the mutation
+		of the next generation, call it before GSimpleGA.step
+
+		Args:
+		    generation (int): Current generation
+		    genomeMatrix (numpy.ndarray): (individuals, weights) array of the population
+		    avgScore (float): Average score of the population
+
+		Returns:
+		    bool: True if the run is hopeless
+		"""
+		distance = getPairwiseDistance(genomeMatrix)
+
+		if distance < self.threshold:
+			self.collapsedGenerations += 1
+			self.mutationFactor = min(self.maxBoost, self.mutationFactor*self.boost)
+		else:
+			self.collapsedGenerations = 0
+			self.mutationFactor = max(1.0, self.mutationFactor/self.boost)
+
+		self.ga.setMutationRate(min(1.0, self.baseMutationRate*self.mutationFactor))
+		for individual in self.ga.internalPop:
+			individual.setParams(gauss_sigma = self.baseSigma*self.mutationFactor)
+
+		self.history.append((generation, distance, self.mutationFactor))
+
+		return self.patience > 0 and self.collapsedGenerations >= self.patience and avgScore < self.hopelessAvgScore
+
+	def logHopeless(self, filename, executionId, avgScore):
+		"""
+		Append the last generation of a hopeless run to a log file, one
+		"executionId;generation;distance;avgScore" line
+
+		Args:
+		    filename (str): Path of the log file
+		    executionId (str): Id of the run
+		    avgScore (float): Average score of the population
+		"""
+		generation, distance, mutationFactor = self.history[-1]
+		fh = open(filename, "a")
+		fh.write(executionId + ";" + str(generation) + ";" + str(round(distance, 4)) + ";" + str(avgScore) + "\n")
+		fh.close()
@@ -0,0 +1,184 @@
+from config import Config
+from world import HeadlessWorld
+from genomeio import loadSeedGenomes
+
+import argparse, json, math, multiprocessing, random, sys
+
+def evaluateEpisode(config, weights, seed, copies = 1):
+	"""
+	Simulate a generation where every panda has the same genome
+
+	Args:
+	    config (Config): Options of the run
+	    weights (list): Weights of the net
+	    seed (int): Seed of the positions of the world
+	    copies (int, optional): Number of pandas with the genome
+
+	Returns:
+	    tuple: (average carrots eaten, fraction of the pandas that survived)
+	"""
+	world = HeadlessWorld(config, [weights]*copies, random.Random(seed))
+	carrotsEaten = world.run()
+	return (float(carrotsEaten.mean()), 1.0 - float(world.isDying.mean()))
+
+def evaluateTask(task):
+	"""
+	Pool worker, evaluate one episode
+
+	Args:
+	    task (tuple): (config, genomeIndex, weights, seed, copies)
+
+	Returns:
+	    tuple: (genomeIndex, seed, score, survival)
+	"""
+	config, genomeIndex, weights, seed, copies = task
+	score, survival = evaluateEpisode(config, weights, seed, copies)
+	return (genomeIndex, seed, score, survival)
+
+def iterEvaluations(config, genomes, seeds, copies = 1, jobs = 1):
+	"""
+	Evaluate every genome on every seeded world, the results are yielded as soon
+	as they are ready, in the order of the tasks
+
+	Args:
+	    config (Config): Options of the run
+	    genomes (list): Weights of each genome
+	    seeds (list): Seeds of the worlds
+	    copies (int, optional): Number of pandas with the genome in each world
+	    jobs (int, optional): Number of processes
+
+	Yields:
+	    tuple: (genomeIndex, seed, average carrots eaten, fraction of the pandas that survived)
+	"""
+	tasks = ((config, genomeIndex, weights, seed, copies) for genomeIndex, weights in enumerate(genomes) for seed in seeds)
+	if jobs <= 1:
+		for task in tasks:
+			yield evaluateTask(task)
+		return
+
+	pool = multiprocessing.Pool(jobs)
+	try:
+		for result in pool.imap(evaluateTask, tasks, chunksize = 4):
+			yield result
+	finally:
+		pool.terminate()
+
+class ScoreDistribution(object):
+	"""
+	Distribution of the scores of a genome over many worlds
+
+	Attributes:
+	    columns (list): Keys of toDict
+
+	    count (int): Number of episodes
+	    scoreSum (float): Sum of the scores
+	    scoreSquaredSum (float): Sum of the squared scores
+	    survivalSum (float): Sum of the survival fractions
+	    histogram (dict): Maps a score to its number of episodes
+
+	"""
+	columns = ["genome", "episodes", "mean", "std", "min", "p10", "median", "p90", "max", "survival"]
+
+	def __init__(self):
+		"""
+		Initialize
+		"""
+		self.count = 0
+		self.scoreSum = 0.0
+		self.scoreSquaredSum = 0.0
+		self.survivalSum = 0.0
+		self.histogram = {}
+
+	def add(self, score, survival):
+		"""
+		Add an episode
+
+		Args:
+		    score (float): Average carrots eaten
+		    survival (float): Fraction of the pandas that survived
+		"""
+		self.count += 1
+		self.scoreSum += score
+		self.scoreSquaredSum += score*score
+		self.survivalSum += survival
+		self.histogram[score] = self.histogram.get(score, 0) + 1
+
+	def getPercentile(self, percentile):
+		"""
+		Returns a percentile of the scores, from the histogram
+
+		Args:
+		    percentile (float): Between 0 and 100
+
+		Returns:
+		    float: The score
+		"""
+		seen = 0
+		for score in sorted(self.histogram):
+			seen += self.histogram[score]
+			if seen*100.0 >= percentile*self.count:
+				return score
+
+	def toDict(self, genome):
+		"""
+		Returns the distribution as a JSON serializable dict
+
+		Args:
+		    genome (int): Index of the genome
+
+		Returns:
+		    dict: The statistics
+		"""
+		mean = self.scoreSum/self.count
+		return {
+			"genome": genome,
+			"episodes": self.count,
+			"mean": round(mean, 4),
+			"std": round(math.sqrt(max(0.0, self.scoreSquaredSum/self.count - mean*mean)), 4),
+			"min": self.getPercentile(0),
+			"p10": self.getPercentile(10),
+			"median": self.getPercentile(50),
+			"p90": self.getPercentile(90),
+			"max": self.getPercentile(100),
+			"survival": round(self.survivalSum/self.count, 4),
+		}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Evaluate stored genomes headless over many seeded worlds")
+	parser.add_argument("sources", nargs = "+", help = "hallOfFame.db, bestGenomes.txt, stats or .archive.json files")
+	parser.add_argument("--top", type = int, default = 10, help = "number of distinct best genomes to evaluate (default: 10)")
+	parser.add_argument("--episodes", type = int, default = 1000, help = "number of seeded worlds per genome (default: 1000)")
+	parser.add_argument("--first-seed", type = int, default = 1, help = "seed of the first world (default: 1)")
+	parser.add_argument("--copies", type = int, default = 1, help = "number of pandas with the genome in each world (default: 1)")
+	parser.add_argument("--jobs", type = int, default = multiprocessing.cpu_count(), help = "number of processes (default: number of CPUs)")
+	parser.add_argument("--config", metavar = "FILE", help = "JSON file with the options of the world")
+	parser.add_argument("--set", action = "append", default = [], metavar = "NAME=VALUE", help = "override an option, can be repeated")
+	parser.add_argument("--episodes-output", metavar = "FILE", help = "also write every episode as it finishes, as JSON lines")
+	parser.add_argument("--format", choices = ("csv", "json"), default = "csv", help = "CSV or JSON lines (default: csv)")
+	args = parser.parse_args()
+
+	config = Config.load(args.config) if args.config else Config()
+	config.set("headless", True)
+	config.override(args.set)
+
+	genomes = loadSeedGenomes(args.sources, args.top, config.numNeurons)
+	seeds = range(args.first_seed, args.first_seed + args.episodes)
+	distributions = [ScoreDistribution() for genome in genomes]
+
+	episodesOutput = open(args.episodes_output, "w") if args.episodes_output else None
+	for genomeIndex, seed, score, survival in iterEvaluations(config, genomes, seeds, args.copies, args.jobs):
+		distributions[genomeIndex].add(score, survival)
+		if episodesOutput:
+			episodesOutput.write(json.dumps({"genome": genomeIndex, "seed": seed, "score": score, "survival": survival}) + "\n")
+			episodesOutput.flush()
+		if distributions[genomeIndex].count == len(seeds):
+			row = distributions[genomeIndex].toDict(genomeIndex)
+			if args.format == "csv":
+				if genomeIndex == 0:
+					sys.stdout.write(",".join(ScoreDistribution.columns) + "\n")
+				sys.stdout.write(",".join(str(row[column]) for column in ScoreDistribution.columns) + "\n")
+			else:
+				sys.stdout.write(json.dumps(row, sort_keys = True) + "\n")
+			sys.stdout.flush()
+	if episodesOutput:
+		episodesOutput.close()
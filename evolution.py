@@ -0,0 +1,164 @@
+from pyevolve import G1DList, GSimpleGA, Initializators, Mutators, Crossovers, Selectors
+
+from diversity import DiversityMonitor
+from selection import FitnessSelector, SteadyStateReplacement
+from warmstart import WarmStartInitializator
+from genomeio import loadSeedGenomes
+from sharedeval import SharedEvaluator
+from genomearchive import GenomeArchive
+
+import random, os, uuid
+
+def createSelector(config, rng = None):
+	"""
+	Build the parent selection of the options
+
+	Args:
+	    config (Config): Options of the run
+	    rng (numpy.random.RandomState, optional): Random number generator, numpy's global one if None
+
+	Returns:
+	    function: Selectors.GRouletteWheel for roulette, otherwise a FitnessSelector
+	"""
+	if config.selector == 'roulette':
+		return Selectors.GRouletteWheel
+	options = {
+		'tournament': {'size': config.tournamentSize},
+		'rank': {'pressure': config.rankPressure},
+		'truncation': {'fraction': config.truncationFraction},
+	}
+	return FitnessSelector(config.selector, rng, **options.get(config.selector, {}))
+
+def createGA(config, evalFunc):
+	"""
+	Configure and initialize the genetic algorithm engine
+
+	Args:
+	    config (Config): Options of the run
+	    evalFunc (function): PyEvolve's individual score evaluation function
+
+	Returns:
+	    GSimpleGA: PyEvolve's Genetic Algorithm object, with the initial population
+	"""
+	genome = G1DList.G1DList(config.numNeurons)
+	genome.setParams(rangemin=-config.weightRange, rangemax=config.weightRange)
+	if config.seedSources:
+		seedGenomes = loadSeedGenomes(config.seedSources, config.pandaNumber, config.numNeurons)
+		genome.initializator.set(WarmStartInitializator(seedGenomes, config.pandaNumber, config.seedFraction, config.seedJitter,
+			random.Random(config.seed) if config.seed else None))
+	else:
+		genome.initializator.set(Initializators.G1DListInitializatorReal)
+	genome.mutator.set(Mutators.G1DListMutatorRealGaussian)
+	genome.crossover.set(Crossovers.G1DListCrossoverTwoPoint)
+	genome.evaluator.set(evalFunc)
+	ga = GSimpleGA.GSimpleGA(genome)
+	genome.setParams(gauss_sigma=config.mutationSigma)
+	ga.setMutationRate(config.mutationRate)
+	ga.selector.set(createSelector(config))
+	ga.setElitism(False)
+	ga.setPopulationSize(config.pandaNumber)
+	ga.initialize()
+	return ga
+
+class HeadlessTrainer(object):
+	"""
+	Evolves a population like Game does, with the same genetic algorithm, selection,
+	replacement and mutation adaptation, but each generation is simulated in one or
+	more HeadlessWorlds, which is much faster than the Panda3D scene, and the fitness
+	of an individual is its average score over them
+
+	Attributes:
+	    config (Config): Options of the run
+	    rng (random.Random): Random number generator of the positions
+	    ga (GSimpleGA): PyEvolve's Genetic Algorithm object
+	    replacement (SteadyStateReplacement): Replacement of the population
+	    diversityMonitor (DiversityMonitor): Adapts the mutation to the diversity
+	    evaluator (SharedEvaluator): Simulates the worlds of each generation
+	    executionId (str): Id of the run, name of its genome archive
+	    genomeArchive (GenomeArchive): Every genome of every generation, None if config.archiveDirectory is empty
+	    scores (list): Fitness of each individual of the evaluated generation
+	    history (list): (generation, average carrots eaten, best average carrots eaten of an individual) of each generation
+
+	"""
+	def __init__(self, config, rng = None, executionId = None):
+		"""
+		Initialize
+
+		Args:
+		    config (Config): Options of the run
+		    rng (random.Random, optional): Random number generator, a new one seeded with config.seed if None
+		    executionId (str, optional): Id of the run, a random one if None
+		"""
+		self.config = config
+		self.rng = rng if rng is not None else random.Random(config.seed if config.seed else None)
+		self.ga = createGA(config, self.scoreEvalFunc)
+		self.replacement = SteadyStateReplacement(config.replaceNumber)
+		self.diversityMonitor = DiversityMonitor(self.ga, config.mutationRate, config.mutationSigma, config.diversityThreshold,
+			config.mutationBoost, config.maxMutationBoost, config.collapsePatience, config.hopelessAvgScore)
+		self.evaluator = SharedEvaluator(config, config.scenariosPerGeneration, config.evaluationJobs)
+		self.executionId = executionId if executionId else str(uuid.uuid4()).replace('-','')
+		self.genomeArchive = None
+		if config.archiveDirectory:
+			if not os.path.exists(config.archiveDirectory):
+				os.makedirs(config.archiveDirectory)
+			self.genomeArchive = GenomeArchive.create(os.path.join(config.archiveDirectory, self.executionId),
+				config.pandaNumber, config.numNeurons, config.getPrecision(), config.maxGenerations + 1)
+		self.scores = []
+		self.history = []
+
+	def scoreEvalFunc(self, chromosome):
+		"""
+		PyEvolve's individual score evaluation function
+
+		Args:
+		    chromosome (G1DList): the genes of the individual
+
+		Returns:
+		    int: the score of the genes of that panda
+		"""
+		return self.scores[chromosome.getParam("pandaId")]
+
+	def evaluateGeneration(self):
+		"""
+		Simulate the current population in new worlds
+
+		Returns:
+		    numpy.ndarray: Average number of carrots eaten by each individual
+		"""
+		for i, individual in enumerate(self.ga.internalPop):
+			individual.setParams(pandaId = i)
+		carrotsEaten, survived = self.evaluator.evaluate([individual.genomeList for individual in self.ga.internalPop], self.rng)
+		self.scores = (carrotsEaten + 3*survived).mean(axis = 0).tolist()
+		return carrotsEaten.mean(axis = 0)
+
+	def run(self, targetScore = None):
+		"""
+		Evolve until the average carrots eaten by a generation reaches the target,
+		the generations are over or the run is hopeless
+
+		Args:
+		    targetScore (float, optional): Average carrots eaten to reach, None to run every generation
+
+		Returns:
+		    int: Generation that reached the target, None if it was not reached
+		"""
+		for generation in range(self.config.maxGenerations + 1):
+			carrotsEaten = self.evaluateGeneration()
+			self.history.append((generation, float(carrotsEaten.mean()), float(carrotsEaten.max())))
+			if self.genomeArchive:
+				self.genomeArchive.writeGeneration(generation, self.evaluator.arrays['weights'], self.scores)
+			if targetScore is not None and carrotsEaten.mean() >= targetScore:
+				return generation
+
+			if self.diversityMonitor.update(generation, self.evaluator.arrays['weights'], float(carrotsEaten.mean())):
+				return None
+			self.replacement.step(self.ga)
+		return None
+
+	def close(self):
+		"""
+		Stop the evaluation processes, free the shared memory and close the genome archive
+		"""
+		self.evaluator.close()
+		if self.genomeArchive:
+			self.genomeArchive.close()
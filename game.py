@@ -1,16 +1,24 @@
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
 from panda3d.core import *
-from direct.gui.OnscreenText import OnscreenText
-
-from pyevolve import G1DList, GSimpleGA, Initializators, Mutators, Crossovers, Selectors
 
 from panda import Panda
 from carrot import Carrot
 from spike import Spike
+from halloffame import HallOfFame
+from config import Config
+from scheduler import TickScheduler
+from hud import Hud
+from healthbars import HealthBars
+from genomearchive import GenomeArchive
+from diversity import DiversityMonitor
+from selection import SteadyStateReplacement
+from evolution import createGA
+
+import layout
 
-from random import randrange
-import sys, uuid, os
+import random, sys, uuid, os
+import numpy
 
 class Game(ShowBase):
 	"""
@@ -18,7 +26,14 @@ class Game(ShowBase):
 	
 	Attributes:
 		executionId (str): A unique random string
+	    options (Config): Options of the run, not named config because ShowBase.config is Panda3D's DConfig
+	    headless (bool): True if running without a window, UI or visual effects
+	    precision (str): Floating point precision of the networks, 'float32' or 'float64'
 	    actualFrameNumber (int): Frame counter
+	    scheduler (TickScheduler): Delayed events of the world, in simulation ticks
+	    rng (random.Random): Random number generator of the positions, seeded with options.seed
+	    hud (Hud): UI text, None when headless
+	    healthBars (HealthBars): The life bars of all the pandas, None when headless
 	    maxFramesPerGeneration (int): Maximum number of frames per generation
 	    maxGenerations (int): Maximum number of generations before exiting
 	    numNeurons (int): Number of weights of the network
@@ -28,30 +43,55 @@ class Game(ShowBase):
 	    gameHeight (int): Height of the world geometry OY plane
 	    gameWidth (int): Width of the world geometry OX plane
 	    statsFilename (str): Path to save statistics
-	    bestGenomeGenes (list): List of the best weights of a population
+	    bestGenomeGenes (list): Copy of the best weights of a population
 	    bestGenomeScore (int): Best score of all individuals
+	    hallOfFame (HallOfFame): Store of the best genome of each generation of all the executions
+	    genomeArchive (GenomeArchive): Every genome of every generation on disk, None if disabled
 	    ga (GSimpleGA): PyEvolve's Genetic Algorithm object
-	    genome (G1DList): PyEvolve's individual container
+	    replacement (SteadyStateReplacement): Replacement of the population each generation
+	    diversityMonitor (DiversityMonitor): Adapts the mutation to the diversity of the population
+	    tickListeners (list): Functions called with the Game at the end of each tick
 	    
 	"""
-	def __init__(self):
+	def __init__(self, config = None, executionId = None):
 		"""
 		Initialize base subsystems and prepare for the 1st generation
+		
+		Args:
+		    config (Config, optional): Options of the run, the defaults if None
+		    executionId (str, optional): Id of the run, a random one if None
 		"""
-		ShowBase.__init__(self)
+		self.options = config if config is not None else Config()
+		self.headless = self.options.headless
+		self.precision = self.options.getPrecision()
 
-		self.executionId = str(uuid.uuid4()).replace('-','')
-		self.statsFilename = "./stats/" + self.executionId + ".txt"
+		ShowBase.__init__(self, windowType = 'none' if self.headless else None)
+
+		self.executionId = executionId if executionId else str(uuid.uuid4()).replace('-','')
+		self.statsFilename = os.path.join(self.options.statsDirectory, self.executionId + ".txt")
 		if not os.path.exists(os.path.dirname(self.statsFilename)):
 			os.makedirs(os.path.dirname(self.statsFilename))
 
-		self.__setUpWindow()
+		if not self.headless:
+			self.__setUpWindow()
 		self.__setUpConstants()
 
 		self.actualFrameNumber = 0
+		self.scheduler = TickScheduler()
+		self.rng = random.Random(self.options.seed if self.options.seed else None)
 		self.bestGenomeScore = 0
 		self.bestGenomeGenes = []
-
+		self.hallOfFame = HallOfFame(self.options.hallOfFameFile)
+		self.genomeArchive = None
+		if self.options.archiveDirectory:
+			if not os.path.exists(self.options.archiveDirectory):
+				os.makedirs(self.options.archiveDirectory)
+			self.genomeArchive = GenomeArchive.create(os.path.join(self.options.archiveDirectory, self.executionId),
+				self.pandaNumber, self.numNeurons, self.precision, self.maxGenerations + 2)
+
+		self.hud = None
+		self.healthBars = None
+		self.tickListeners = []
 		self.__setUpScene()
 		self.__setUpGA()
 
@@ -59,7 +99,8 @@ class Game(ShowBase):
 		self.__generatePandas()
 		self.__generateCarrots()
 	
-		self.taskMgr.add(Carrot.spinCarrots, "spinCarrots")
+		if not self.headless:
+			self.taskMgr.add(Carrot.spinCarrots, "spinCarrots", extraArgs = [self], appendTask = True)
 		self.taskMgr.add(self.__logicLoop, "logicLoop")
 
 	def __setUpWindow(self):
@@ -72,23 +113,30 @@ class Game(ShowBase):
 
 	def __setUpConstants(self):
 		"""
-		Constants
+		Constants, read from the configuration
 		"""
-		self.gameWidth = 164
-		self.gameHeight = 164
+		self.gameWidth = self.options.gameWidth
+		self.gameHeight = self.options.gameHeight
 
-		self.pandaNumber = 8
-		self.carrotNumber = 16
-		self.spikeNumber = 8
-		self.numNeurons = 252
+		self.pandaNumber = self.options.pandaNumber
+		self.carrotNumber = self.options.carrotNumber
+		self.spikeNumber = self.options.spikeNumber
+		self.numNeurons = self.options.numNeurons
 
-		self.maxFramesPerGeneration = 1024
-		self.maxGenerations = 32
+		self.maxFramesPerGeneration = self.options.maxFramesPerGeneration
+		self.maxGenerations = self.options.maxGenerations
 
 	def __setUpScene(self):
 		"""
-		Build the scene geometry, lights, UI text, camera and spike walls
+		Build the scene geometry, lights, UI text, camera and spike walls,
+		only the spike walls are built when headless
 		"""
+		for x, y in layout.getWallSpikePositions(self.gameWidth, self.gameHeight):
+			Spike(self, x, y, 'wall')
+
+		if self.headless:
+			return
+
 		cm = CardMaker('card')
 		cm.setFrame(-self.gameWidth/2,self.gameWidth/2,-self.gameHeight/2,self.gameHeight/2)
 		cm.setUvRange((0, 0), (2, 2))
@@ -98,9 +146,8 @@ class Game(ShowBase):
 		card.setTexture(tex)
 		card.lookAt(0, 0, -1)
 
-		self.frameGenText = OnscreenText(align=TextNode.ALeft, text = '', pos = (-1.7, 0.9), scale = 0.1, fg = (1,1,1,1))
-		self.currentGenText = OnscreenText(align=TextNode.ALeft, text = '', pos = (-1.7, 0.8), scale = 0.1, fg = (1,1,1,1))
-		self.avgScoreText = OnscreenText(align=TextNode.ALeft, text = '', pos = (-1.7, 0.7), scale = 0.1, fg = (1,1,1,1))
+		self.hud = Hud(3, self.options.hudRefreshRate)
+		self.healthBars = HealthBars(self, self.pandaNumber)
 	
 		dlight = DirectionalLight('dlight')
 		dlight.setColor(VBase4(1, 1, 1, 1))
@@ -119,13 +166,6 @@ class Game(ShowBase):
 		alnp = self.render.attachNewNode(alight)
 		self.render.setLight(alnp)
 
-		for i in range(-self.gameWidth/2, self.gameWidth/2 + 1, 8):
-			Spike(self, i, -self.gameHeight/2, 'wall')
-			Spike(self, i, self.gameHeight/2, 'wall')
-		for i in range(-self.gameHeight/2 + 8,self.gameHeight/2 + 1 - 8, 8):
-			Spike(self, -self.gameWidth/2, i, 'wall')
-			Spike(self, self.gameWidth/2, i, 'wall')
-
 		self.disableMouse()
 		self.camera.setPos(0, -100, 80)
 		self.camera.lookAt(0, 0, 0)
@@ -134,77 +174,29 @@ class Game(ShowBase):
 		"""
 		Configure and initialize the genetic algorithm engine
 		"""
-		self.genome = G1DList.G1DList(self.numNeurons)
-		self.genome.setParams(rangemin=-3.0, rangemax=3.0)
-		self.genome.initializator.set(Initializators.G1DListInitializatorReal)
-		self.genome.mutator.set(Mutators.G1DListMutatorRealGaussian)
-		self.genome.crossover.set(Crossovers.G1DListCrossoverTwoPoint)
-		self.genome.evaluator.set(self.scoreEvalFunc)
-		self.ga = GSimpleGA.GSimpleGA(self.genome)
-		self.ga.setMutationRate(0.05)
-		self.ga.selector.set(Selectors.GRouletteWheel)
-		self.ga.setElitism(False)
-		self.ga.setPopulationSize(self.pandaNumber)
-		self.ga.initialize()
+		self.ga = createGA(self.options, self.scoreEvalFunc)
+		self.replacement = SteadyStateReplacement(self.options.replaceNumber)
+
+		self.diversityMonitor = DiversityMonitor(self.ga, self.options.mutationRate, self.options.mutationSigma, self.options.diversityThreshold,
+			self.options.mutationBoost, self.options.maxMutationBoost, self.options.collapsePatience, self.options.hopelessAvgScore)
 
 	def __generateSpikes(self):
 		"""
 		Generate randomly positioned normal spikes in a way that there is
 		a minimum distance between them
 		"""
-		i = 0
-		while i < self.spikeNumber:
-			colisionDetected = False
-			x = randrange(10 - self.gameWidth/2, -10 + self.gameWidth/2)
-			y = randrange(10 - self.gameHeight/2, -10 + self.gameHeight/2)
-			spikePoint = Point3(x, y, 0)
-
-			for spike in Spike.spikeNormalList:
-				point = spike.spikeHandle.getPos(self.render)
-				dist = (point.getXy() - spikePoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-
-			if colisionDetected:
-				continue
-
+		for x, y in layout.placeSpikes(self.rng, self.gameWidth, self.gameHeight, self.spikeNumber):
 			Spike(self, x, y)
-			i += 1
 
 	def __generatePandas(self):
 		"""
 		Generate randomly positioned pandas in a way that there is
 		a minimum distance between them and the spikes
 		"""
-		i = 0
-		while(i < self.pandaNumber):
-			colisionDetected = False
-			x = randrange(50 - self.gameWidth/2, -50 + self.gameWidth/2)
-			y = randrange(50 - self.gameHeight/2, -50 + self.gameHeight/2)
-			pandaPoint = Point3(x, y, 1.5)
-
-			for panda in Panda.pandaList:
-				point = panda.pandaHandle.getPos(self.render)
-				dist = (point.getXy() - pandaPoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-			if colisionDetected:
-				continue
-
-			for spike in Spike.spikeNormalList:
-				point = spike.spikeHandle.getPos(self.render)
-				dist = (point.getXy() - pandaPoint.getXy()).lengthSquared()
-				if dist < 100:
-					colisionDetected = True
-					break
-			if colisionDetected:
-				continue
-
+		spikes = [(spike.spikeHandle.getX(), spike.spikeHandle.getY()) for spike in Spike.spikeNormalList]
+		for i, (x, y, h) in enumerate(layout.placePandas(self.rng, self.gameWidth, self.gameHeight, self.pandaNumber, spikes)):
 			self.ga.internalPop[i].setParams(pandaId = i)
-			Panda(self, x, y, self.ga.internalPop[i])
-			i += 1
+			Panda(self, x, y, h, self.ga.internalPop[i])
 
 	def __generateCarrots(self):
 		"""
@@ -222,10 +214,10 @@ class Game(ShowBase):
 		"""
 		if self.bestGenomeScore < Panda.getBestPanda().carrotsEaten:
 			self.bestGenomeScore = Panda.getBestPanda().carrotsEaten
-			self.bestGenomeGenes = Panda.getBestPanda().brainWeights
+			self.bestGenomeGenes = list(Panda.getBestPanda().brainWeights)
 
 		self.actualFrameNumber = 0
-		self.ga.step()
+		self.replacement.step(self.ga)
 
 		Spike.clearNormalSpikes()
 		Panda.clearPandas(self)
@@ -250,7 +242,7 @@ class Game(ShowBase):
 	def __logicLoop(self, task):
 		"""
 		Main logic loop, if the actual frames > max frames go to next generation,
-		save statistics to file, update the pandas and the UI text
+		save statistics to file, run the scheduled events, update the pandas and the UI text
 		
 		Args:
 		    task (task): Panda3D requires this param
@@ -264,19 +256,29 @@ class Game(ShowBase):
 		if self.actualFrameNumber > self.maxFramesPerGeneration or Panda.livingPandas == 0:
 			if self.bestGenomeScore < Panda.getBestPanda().carrotsEaten:
 				self.bestGenomeScore = Panda.getBestPanda().carrotsEaten
-				self.bestGenomeGenes = Panda.getBestPanda().brainWeights
+				self.bestGenomeGenes = list(Panda.getBestPanda().brainWeights)
+
+			self.__saveBestPandaToHallOfFame()
 
 			if ((self.ga.getCurrentGeneration()+1) % 10) == 0:
 				self.__saveBestGenomeToFile()
 
 			self.__saveGenomeStatsToFile()
+			self.__saveGenomesToArchive()
+			if self.__monitorDiversity():
+				sys.exit()
 			self.__goNextGen()
 
+		self.scheduler.advance()
 		for panda in Panda.pandaList:
 			panda.update(self, Carrot.carrotList, Spike.spikeList)
 
-		self.__updateText()
+		if not self.headless:
+			self.healthBars.update(self)
+			self.__updateText()
 		self.actualFrameNumber += 1
+		for listener in self.tickListeners:
+			listener(self)
 		return Task.cont
 
 	def __terminationCriteria(self):
@@ -292,13 +294,35 @@ class Game(ShowBase):
 			return True
 		return False
 
+	def __monitorDiversity(self):
+		"""
+		Adapt the mutation of the next generation to the diversity of the population,
+		and log the run if it is hopeless
+		
+		Returns:
+		    bool: True if the run is hopeless and must exit
+		"""
+		if self.genomeArchive:
+			genomeMatrix = self.genomeArchive.getGeneration(self.ga.getCurrentGeneration())[0]
+		else:
+			genomeMatrix = numpy.array([panda.brainWeights for panda in Panda.pandaList])
+
+		if not self.diversityMonitor.update(self.ga.getCurrentGeneration(), genomeMatrix, Panda.getAvgScore()):
+			return False
+
+		generation, distance, mutationFactor = self.diversityMonitor.history[-1]
+		self.diversityMonitor.logHopeless(os.path.join(self.options.statsDirectory, "hopeless.log"), self.executionId, Panda.getAvgScore()) #not .txt, the stats files of the directory are read as a whole
+		print("Execution " + self.executionId + " is hopeless at generation " + str(generation) + ", diversity " + str(round(distance, 4)))
+		return True
+
 	def __updateText(self):
 		"""
-		Update UI text
+		Update UI text, the HUD only redraws the lines that changed and limits the refresh rate
 		"""
-		self.frameGenText.setText("Frame: " + str(self.actualFrameNumber) + " of " + str(self.maxFramesPerGeneration))
-		self.currentGenText.setText("Generation: " + str(self.ga.getCurrentGeneration()))
-		self.avgScoreText.setText("Average score: " + str(Panda.getAvgScore()))
+		self.hud.setLine(0, "Frame: " + str(self.actualFrameNumber) + " of " + str(self.maxFramesPerGeneration))
+		self.hud.setLine(1, "Generation: " + str(self.ga.getCurrentGeneration()))
+		self.hud.setLine(2, "Average score: " + str(Panda.getAvgScore()))
+		self.hud.refresh()
 
 	def __saveBestGenomeToFile(self):
 		"""
@@ -308,6 +332,24 @@ class Game(ShowBase):
 		fh.write(str(self.bestGenomeScore) + ";" + self.executionId + ".txt;" + str(self.bestGenomeGenes) + "\n")
 		fh.close
 
+	def __saveBestPandaToHallOfFame(self):
+		"""
+		Save the best individual of the current generation to the hall of fame
+		"""
+		bestPanda = Panda.getBestPanda()
+		self.hallOfFame.add(bestPanda.carrotsEaten, self.executionId, self.ga.getCurrentGeneration(), bestPanda.brainWeights)
+
+	def __saveGenomesToArchive(self):
+		"""
+		Write the population to the genome archive
+		"""
+		if not self.genomeArchive:
+			return
+		generation = self.ga.getCurrentGeneration()
+		for pandaId, panda in Panda.pandaIds.items():
+			self.genomeArchive.writeIndividual(generation, pandaId, panda.brainWeights, panda.carrotsEaten)
+		self.genomeArchive.finishGeneration(generation)
+
 	def __saveGenomeStatsToFile(self):
 		"""
 		Save the population to a file
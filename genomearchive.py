@@ -0,0 +1,215 @@
+import json, os
+
+import numpy
+
+class GenomeArchive(object):
+	"""
+	Every genome of every generation of an execution, kept on disk in memory mapped
+	files so it does not have to fit in RAM. The weights are a (generation, individual,
+	weight) array and the scores a (generation, individual) array. The population of
+	the genetic algorithm stays in PyEvolve's lists, Game and HeadlessTrainer copy it
+	to the archive at the end of each generation, and it can be read back without
+	copying it.
+
+	An archive is made of three files: <name>.archive.json with the shape and the
+	number of generations written, <name>.weights and <name>.scores.
+
+	Attributes:
+	    headerFilename (str): Path of the header file
+	    populationSize (int): Number of individuals of each generation
+	    numWeights (int): Number of weights of each individual
+	    dtype (numpy.dtype): Type of the weights
+	    generationNumber (int): Number of generations written
+	    capacity (int): Number of generations the files can hold before growing
+	    readOnly (bool): True if the archive was opened for reading
+	    weights (numpy.memmap): (capacity, populationSize, numWeights) array
+	    scores (numpy.memmap): (capacity, populationSize) array
+
+	"""
+	def __init__(self, headerFilename, populationSize, numWeights, precision = 'float64', capacity = 32, readOnly = False, generationNumber = 0):
+		"""
+		Map the files, use GenomeArchive.create or GenomeArchive.open instead
+
+		Args:
+		    headerFilename (str): Path of the header file
+		    populationSize (int): Number of individuals of each generation
+		    numWeights (int): Number of weights of each individual
+		    precision (str, optional): 'float32' or 'float64'
+		    capacity (int, optional): Number of generations the files can hold before growing
+		    readOnly (bool, optional): Open the files for reading
+		    generationNumber (int, optional): Number of generations already written
+		"""
+		self.headerFilename = headerFilename
+		self.populationSize = populationSize
+		self.numWeights = numWeights
+		self.dtype = numpy.dtype(precision)
+		self.generationNumber = generationNumber
+		self.readOnly = readOnly
+		self.capacity = 0
+		self.weights = None
+		self.scores = None
+		self.__map(max(capacity, generationNumber, 1))
+
+	def __getBaseFilename(self):
+		"""
+		Returns the path of the archive without the .archive.json extension
+
+		Returns:
+		    str: The path
+		"""
+		return self.headerFilename[:-len(".archive.json")]
+
+	def __map(self, capacity):
+		"""
+		Map the files with room for a number of generations, the files grow if needed
+
+		Args:
+		    capacity (int): Number of generations
+		"""
+		if self.weights is not None:
+			self.weights.flush()
+			self.scores.flush()
+
+		if self.readOnly:
+			mode = 'r'
+		elif os.path.exists(self.__getBaseFilename() + ".weights"):
+			mode = 'r+'
+		else:
+			mode = 'w+'
+
+		self.weights = numpy.memmap(self.__getBaseFilename() + ".weights", dtype = self.dtype, mode = mode,
+			shape = (capacity, self.populationSize, self.numWeights))
+		self.scores = numpy.memmap(self.__getBaseFilename() + ".scores", dtype = numpy.float32, mode = mode,
+			shape = (capacity, self.populationSize))
+		self.capacity = capacity
+
+	def __writeHeader(self):
+		"""
+		Save the shape of the archive
+		"""
+		with open(self.headerFilename, "w") as fh:
+			json.dump({"populationSize": self.populationSize, "numWeights": self.numWeights, "precision": self.dtype.name,
+				"capacity": self.capacity, "generationNumber": self.generationNumber}, fh)
+
+	def writeIndividual(self, generation, index, weights, score):
+		"""
+		Store an individual, the files grow if the generation does not fit
+
+		Args:
+		    generation (int): Generation of the individual
+		    index (int): Position of the individual in the population
+		    weights (list): Weights of the net
+		    score (float): Score of the individual
+		"""
+		if generation >= self.capacity:
+			self.__map(max(generation + 1, self.capacity*2))
+		self.weights[generation, index] = weights
+		self.scores[generation, index] = score
+
+	def writeGeneration(self, generation, weights, scores):
+		"""
+		Store a whole generation and flush it, the files grow if it does not fit
+
+		Args:
+		    generation (int): The generation
+		    weights (numpy.ndarray): (populationSize, numWeights) weights of the nets
+		    scores (list): Score of each individual
+		"""
+		if generation >= self.capacity:
+			self.__map(max(generation + 1, self.capacity*2))
+		self.weights[generation] = weights
+		self.scores[generation] = scores
+		self.finishGeneration(generation)
+
+	def finishGeneration(self, generation):
+		"""
+		Flush a generation to disk and record it in the header
+
+		Args:
+		    generation (int): Generation that has been completely written
+		"""
+		self.generationNumber = max(self.generationNumber, generation + 1)
+		self.weights.flush()
+		self.scores.flush()
+		self.__writeHeader()
+
+	def getGeneration(self, generation):
+		"""
+		Returns the weights and scores of a generation without copying them
+
+		Args:
+		    generation (int): The generation
+
+		Returns:
+		    tuple: (populationSize, numWeights) weights and (populationSize,) scores
+		"""
+		if not 0 <= generation < self.generationNumber:
+			raise IndexError("Generation %d is not in the archive" % generation)
+		return (self.weights[generation], self.scores[generation])
+
+	def getTop(self, k):
+		"""
+		Returns the k individuals with the highest score of all the generations
+
+		Args:
+		    k (int): Maximum number of individuals
+
+		Returns:
+		    list: (score, generation, index, weights) tuples, best first, weights are views of the archive
+		"""
+		scores = self.scores[:self.generationNumber].reshape(-1)
+		k = min(k, len(scores))
+		if k <= 0:
+			return []
+		best = numpy.argpartition(-scores, k - 1)[:k]
+		best = best[numpy.argsort(-scores[best], kind = 'mergesort')]
+		return [(float(scores[i]), int(i//self.populationSize), int(i%self.populationSize),
+			self.weights[i//self.populationSize, i%self.populationSize]) for i in best]
+
+	def close(self):
+		"""
+		Flush and unmap the files
+		"""
+		if not self.readOnly:
+			self.finishGeneration(self.generationNumber - 1)
+		self.weights = None
+		self.scores = None
+
+	@staticmethod
+	def create(baseFilename, populationSize, numWeights, precision = 'float64', capacity = 32):
+		"""
+		Create an empty archive
+
+		Args:
+		    baseFilename (str): Path of the archive without extension
+		    populationSize (int): Number of individuals of each generation
+		    numWeights (int): Number of weights of each individual
+		    precision (str, optional): 'float32' or 'float64'
+		    capacity (int, optional): Number of generations to make room for
+
+		Returns:
+		    GenomeArchive: The archive
+		"""
+		for extension in (".weights", ".scores"):
+			if os.path.exists(baseFilename + extension):
+				os.remove(baseFilename + extension)
+		archive = GenomeArchive(baseFilename + ".archive.json", populationSize, numWeights, precision, capacity)
+		archive.__writeHeader()
+		return archive
+
+	@staticmethod
+	def open(headerFilename, readOnly = True):
+		"""
+		Open an existing archive
+
+		Args:
+		    headerFilename (str): Path of the .archive.json file
+		    readOnly (bool, optional): False to keep writing generations
+
+		Returns:
+		    GenomeArchive: The archive
+		"""
+		with open(headerFilename) as fh:
+			header = json.load(fh)
+		return GenomeArchive(headerFilename, header["populationSize"], header["numWeights"], header["precision"],
+			header["capacity"], readOnly, header["generationNumber"])
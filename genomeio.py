@@ -0,0 +1,127 @@
+from halloffame import HallOfFame
+from genomearchive import GenomeArchive
+
+import heapq
+
+def parseWeights(text):
+	"""
+	Parse the weights written by str(list)
+
+	Args:
+	    text (str): Something like "[0.5, -1.25, 2.0]"
+
+	Returns:
+	    list: List of floats
+	"""
+	text = text.strip()
+	if not (text.startswith("[") and text.endswith("]")):
+		raise ValueError("Malformed weights: " + text[:32])
+	return [float(weight) for weight in text[1:-1].split(",")]
+
+def iterBestGenomes(filename):
+	"""
+	Stream the genomes of a bestGenomes.txt file, one line at a time
+
+	Args:
+	    filename (str): Path of the file, each line is "score;executionId.txt;[weights]"
+
+	Yields:
+	    tuple: (score, executionId, weights)
+	"""
+	with open(filename) as fh:
+		for line in fh:
+			if not line.strip():
+				continue
+			score, statsFilename, weights = line.split(";", 2)
+			executionId = statsFilename[:-len(".txt")] if statsFilename.endswith(".txt") else statsFilename
+			yield (float(score), executionId, parseWeights(weights))
+
+def iterScoredGenomes(filename):
+	"""
+	Stream (score, weights) pairs from either a bestGenomes.txt or a stats file,
+	the format is detected from the second field of each line
+
+	Args:
+	    filename (str): Path of the file
+
+	Yields:
+	    tuple: (score, weights)
+	"""
+	with open(filename) as fh:
+		for line in fh:
+			if not line.strip():
+				continue
+			first, second, weights = line.split(";", 2)
+			if second.endswith(".txt"):
+				yield (float(first), parseWeights(weights))
+			else:
+				yield (float(second), parseWeights(weights))
+
+def selectTopGenomes(scoredGenomes, k, numWeights = None):
+	"""
+	Keep the k best distinct genomes of a stream using a bounded heap, so the
+	stream is never held in memory
+
+	Args:
+	    scoredGenomes (iterable): (score, weights) pairs
+	    k (int): Maximum number of genomes to keep
+	    numWeights (int, optional): Skip genomes that do not have this number of weights
+
+	Returns:
+	    list: (score, weights) pairs, best first
+	"""
+	heap = []
+	keys = {}
+	order = 0
+	for score, weights in scoredGenomes:
+		if numWeights is not None and len(weights) != numWeights:
+			continue
+		key = tuple(weights)
+		if key in keys:
+			if score > keys[key]:
+				heap = [item if item[2] != key else (score, item[1], key) for item in heap]
+				heapq.heapify(heap)
+				keys[key] = score
+			continue
+
+		order += 1
+		if len(heap) < k:
+			heapq.heappush(heap, (score, -order, key))
+			keys[key] = score
+		elif heap and score > heap[0][0]:
+			del keys[heapq.heapreplace(heap, (score, -order, key))[2]]
+			keys[key] = score
+
+	return [(score, list(key)) for score, order, key in sorted(heap, reverse = True)]
+
+def loadSeedGenomes(sources, number, numWeights):
+	"""
+	Load the best distinct genomes from hall of fame databases (.db), genome archives
+	(.archive.json), bestGenomes.txt files or stats files, the text files are streamed
+	line by line and the archives are read without loading them
+
+	Args:
+	    sources (list): Paths of the files
+	    number (int): Maximum number of genomes
+	    numWeights (int): Genomes with another number of weights are skipped
+
+	Returns:
+	    list: Weights of the genomes, best first
+	"""
+	def scoredGenomes():
+		for source in sources:
+			if source.endswith(".db"):
+				hallOfFame = HallOfFame(source)
+				for score, executionId, generation, weights in hallOfFame.getTop(number, numWeights = numWeights):
+					yield (score, weights.tolist())
+				hallOfFame.close()
+			elif source.endswith(".archive.json"):
+				archive = GenomeArchive.open(source)
+				if archive.numWeights == numWeights: #every individual, best first, the copies of a genome are skipped by selectTopGenomes
+					for score, generation, index, weights in archive.getTop(archive.generationNumber*archive.populationSize):
+						yield (score, weights.tolist())
+			else:
+				for scoredGenome in iterScoredGenomes(source):
+					yield scoredGenome
+
+	return [weights for score, weights in selectTopGenomes(scoredGenomes(), number, numWeights)]
@@ -0,0 +1,300 @@
+from config import Config
+from world import HeadlessWorld
+
+import argparse, json, random, sys
+
+import numpy
+
+class GoldenTrace(object):
+	"""
+	Tick by tick record of a seeded generation: the inputs and outputs of the net,
+	the position, heading, health, score and state of every panda after each tick,
+	with the options and the genomes needed to replay it
+
+	Attributes:
+	    fields (list): Names of the per tick arrays
+
+	    config (Config): Options of the generation, config.seed places the world
+	    genomes (numpy.ndarray): (pandas, weights) genome of each panda
+	    ticks (dict): Maps each field to the list of its values, one (pandas, ...) array per tick
+
+	"""
+	fields = ['inputs', 'outputs', 'positions', 'headings', 'health', 'carrotsEaten', 'isDying']
+
+	def __init__(self, config, genomes):
+		"""
+		Initialize
+
+		Args:
+		    config (Config): Options of the generation
+		    genomes (list): Genome of each panda
+		"""
+		self.config = config
+		self.genomes = numpy.array(genomes, dtype = numpy.float64)
+		self.ticks = dict((field, []) for field in GoldenTrace.fields)
+
+	def __len__(self):
+		"""
+		Returns the number of ticks
+
+		Returns:
+		    int: Number of ticks recorded
+		"""
+		return len(self.ticks['health'])
+
+	def append(self, **values):
+		"""
+		Record a tick
+
+		Args:
+		    **values: One array per field, the value of each panda
+		"""
+		for field in GoldenTrace.fields:
+			self.ticks[field].append(numpy.array(values[field], dtype = numpy.float64))
+
+	def getTick(self, tick):
+		"""
+		Returns the values of a tick
+
+		Args:
+		    tick (int): Index of the tick
+
+		Returns:
+		    dict: Maps each field to its (pandas, ...) array
+		"""
+		return dict((field, self.ticks[field][tick]) for field in GoldenTrace.fields)
+
+	def save(self, filename):
+		"""
+		Save to a compressed numpy file
+
+		Args:
+		    filename (str): Path of the file
+		"""
+		arrays = dict((field, numpy.array(self.ticks[field])) for field in GoldenTrace.fields)
+		with open(filename, "wb") as fh:
+			config = numpy.frombuffer(json.dumps(self.config.toDict()).encode("utf-8"), dtype = numpy.uint8) #bytes, the same in Python 2 and 3
+			numpy.savez_compressed(fh, config = config, genomes = self.genomes, **arrays)
+
+	@staticmethod
+	def load(filename):
+		"""
+		Load a trace saved with save
+
+		Args:
+		    filename (str): Path of the file
+
+		Returns:
+		    GoldenTrace: The trace
+		"""
+		data = numpy.load(filename)
+		trace = GoldenTrace(Config(**json.loads(data['config'].tobytes().decode("utf-8"))), data['genomes'])
+		for field in GoldenTrace.fields:
+			trace.ticks[field] = list(data[field])
+		return trace
+
+def recordGameTrace(config):
+	"""
+	Record the first generation of the reference implementation, the Panda3D
+	scene of Game, run headless
+
+	Args:
+	    config (Config): Options of the generation, with a seed that is not 0
+
+	Returns:
+	    GoldenTrace: The trace
+	"""
+	from game import Game #Panda3D is only needed to record the traces
+	from panda import Panda
+
+	random.seed(config.seed) #the initial population of PyEvolve
+	config.set("headless", True)
+	game = Game(config, "goldentrace")
+	pandas = sorted(Panda.pandaList, key = lambda panda: panda.pandaIndex)
+	trace = GoldenTrace(config, [panda.brainWeights for panda in pandas])
+	lastValues = {}
+
+	def recordTick(game):
+		for panda in pandas:
+			if panda.isAlive: #the nodes of a removed panda are gone, it keeps its last values
+				lastValues[panda.pandaIndex] = (list(panda.brainInput), list(panda.brainOutput),
+					(panda.pandaHandle.getX(game.render), panda.pandaHandle.getY(game.render)), panda.pandaHandle.getH(game.render))
+		trace.append(
+			inputs = [lastValues[panda.pandaIndex][0] for panda in pandas],
+			outputs = [lastValues[panda.pandaIndex][1] for panda in pandas],
+			positions = [lastValues[panda.pandaIndex][2] for panda in pandas],
+			headings = [lastValues[panda.pandaIndex][3] for panda in pandas],
+			health = [panda.health for panda in pandas],
+			carrotsEaten = [panda.carrotsEaten for panda in pandas],
+			isDying = [panda.isDying for panda in pandas])
+		if game.actualFrameNumber > config.maxFramesPerGeneration or Panda.livingPandas == 0:
+			game.taskMgr.stop()
+
+	game.tickListeners.append(recordTick)
+	game.run()
+	return trace
+
+def replayHeadlessWorld(config, genomes):
+	"""
+	Replay a generation in a HeadlessWorld
+
+	Args:
+	    config (Config): Options of the generation
+	    genomes (numpy.ndarray): (pandas, weights) genome of each panda
+
+	Yields:
+	    tuple: (tick, values) the index of the last tick of each step and the dict of the fields
+	"""
+	world = HeadlessWorld(config, list(genomes), random.Random(config.seed))
+	while not world.isFinished():
+		world.step()
+		yield (world.frameNumber - 1, {
+			'inputs': world.brainInputs,
+			'outputs': world.brainOutputs,
+			'positions': world.pandaPositions,
+			'headings': world.pandaHeadings,
+			'health': world.health,
+			'carrotsEaten': world.carrotsEaten,
+			'isDying': world.isDying,
+		})
+
+backends = {
+	'headless': replayHeadlessWorld,
+}
+
+defaultTolerances = {
+	'inputs': 1e-3,
+	'outputs': 1e-3,
+	'positions': 1e-2,
+	'headings': 1e-2,
+	'health': 1e-3,
+	'carrotsEaten': 0,
+	'isDying': 0,
+}
+
+def getErrors(field, expected, actual):
+	"""
+	Absolute difference between the recorded and the replayed values of a field,
+	the headings are compared modulo 360 degrees
+
+	Args:
+	    field (str): Name of the field
+	    expected (numpy.ndarray): Recorded values
+	    actual (numpy.ndarray): Replayed values
+
+	Returns:
+	    numpy.ndarray: The differences, with the shape of the values
+	"""
+	difference = numpy.asarray(actual, dtype = numpy.float64) - expected
+	if field == 'headings':
+		difference = (difference + 180.0) % 360.0 - 180.0
+	return numpy.abs(difference)
+
+def checkTrace(trace, backend, tolerances = None, config = None):
+	"""
+	Replay a trace with a backend and find the first tick where they diverge
+
+	Args:
+	    trace (GoldenTrace): The recorded generation
+	    backend (function): (config, genomes) -> iterator of (tick, values), one of backends
+	    tolerances (dict, optional): Maximum absolute error of each field, defaultTolerances if None
+	    config (Config, optional): Options of the replay, the ones of the trace if None
+
+	Returns:
+	    dict: ticks compared, maximum error of each field before the divergence, and the divergence,
+	    None or {tick, field, panda, expected, actual}
+	"""
+	tolerances = tolerances if tolerances is not None else defaultTolerances
+	config = config if config is not None else trace.config
+	maxErrors = dict((field, 0.0) for field in GoldenTrace.fields)
+	divergence = None
+	comparedTicks = 0
+	lastTick = -1
+
+	for tick, values in backend(config, trace.genomes):
+		lastTick = tick
+		if tick >= len(trace):
+			divergence = {'tick': tick, 'field': 'length', 'panda': None, 'expected': len(trace), 'actual': tick + 1}
+			break
+		expectedValues = trace.getTick(tick)
+		for field in GoldenTrace.fields:
+			errors = getErrors(field, expectedValues[field], values[field])
+			if errors.max() > tolerances[field]:
+				panda = int(numpy.unravel_index(errors.argmax(), errors.shape)[0])
+				divergence = {'tick': tick, 'field': field, 'panda': panda,
+					'expected': expectedValues[field][panda].tolist(), 'actual': numpy.asarray(values[field][panda]).tolist()}
+				break
+			maxErrors[field] = max(maxErrors[field], float(errors.max()))
+		if divergence:
+			break
+		comparedTicks += 1
+
+	if divergence is None and lastTick != len(trace) - 1:
+		divergence = {'tick': lastTick + 1, 'field': 'length', 'panda': None, 'expected': len(trace), 'actual': lastTick + 1}
+
+	return {'comparedTicks': comparedTicks, 'maxErrors': maxErrors, 'divergence': divergence}
+
+def parseTolerances(assignments):
+	"""
+	Convert "field=tolerance" strings to a dict of tolerances
+
+	Args:
+	    assignments (list): Strings like "positions=0.05"
+
+	Returns:
+	    dict: defaultTolerances with the overridden fields
+	"""
+	tolerances = dict(defaultTolerances)
+	for assignment in assignments:
+		field, value = assignment.split("=", 1)
+		if field not in tolerances:
+			raise KeyError("Unknown field '%s'" % field)
+		tolerances[field] = float(value)
+	return tolerances
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Record seeded generations of the Panda3D implementation and check other backends against them")
+	subparsers = parser.add_subparsers(dest = "command")
+
+	recordParser = subparsers.add_parser("record", help = "record the first generation of Game, needs Panda3D")
+	recordParser.add_argument("trace", help = "output .npz file")
+	recordParser.add_argument("--seed", type = int, default = 1, help = "seed of the world and the initial population (default: 1)")
+	recordParser.add_argument("--config", metavar = "FILE", help = "JSON file with the options of the generation")
+	recordParser.add_argument("--set", action = "append", default = [], metavar = "NAME=VALUE", help = "override an option, can be repeated")
+
+	checkParser = subparsers.add_parser("check", help = "replay traces with a backend and report the first divergent tick")
+	checkParser.add_argument("traces", nargs = "+", help = ".npz files written by record")
+	checkParser.add_argument("--backend", choices = sorted(backends), default = "headless", help = "implementation to check (default: headless)")
+	checkParser.add_argument("--set", action = "append", default = [], metavar = "NAME=VALUE", help = "override an option of the replay, like precision=float32")
+	checkParser.add_argument("--tolerance", action = "append", default = [], metavar = "FIELD=VALUE", help = "maximum absolute error of a field, can be repeated")
+	args = parser.parse_args()
+
+	if args.command == "record":
+		config = Config.load(args.config) if args.config else Config()
+		config.override(args.set + ["seed=%d" % args.seed])
+		if not config.seed:
+			parser.error("the seed can not be 0")
+		trace = recordGameTrace(config)
+		trace.save(args.trace)
+		print("%s: %d ticks of %d pandas" % (args.trace, len(trace), len(trace.genomes)))
+
+	elif args.command == "check":
+		tolerances = parseTolerances(args.tolerance)
+		failed = 0
+		for filename in args.traces:
+			trace = GoldenTrace.load(filename)
+			config = Config(**trace.config.toDict())
+			config.override(args.set)
+			result = checkTrace(trace, backends[args.backend], tolerances, config)
+			errors = ", ".join("%s %.3g" % (field, result['maxErrors'][field]) for field in GoldenTrace.fields)
+			if result['divergence'] is None:
+				print("%s: %d ticks match, max errors: %s" % (filename, result['comparedTicks'], errors))
+			else:
+				failed += 1
+				print("%s: diverges at tick %d on %s of panda %s, expected %s, got %s (max errors before: %s)" % (filename,
+					result['divergence']['tick'], result['divergence']['field'], result['divergence']['panda'],
+					json.dumps(result['divergence']['expected']), json.dumps(result['divergence']['actual']), errors))
+		sys.exit(1 if failed else 0)
+
+	else:
+		parser.print_help()
@@ -0,0 +1,148 @@
+import sqlite3, hashlib, argparse
+
+import numpy
+
+class HallOfFame(object):
+	"""
+	Embedded SQLite store of the best genomes of every execution, indexed by score,
+	execution id and generation. The weights are kept as a little endian float64 blob
+	and a genome is stored only once, identified by the SHA-1 of that blob.
+
+	Several executions can write to the same file at the same time, SQLite's write
+	ahead log lets the readers continue while a writer holds the lock.
+
+	Attributes:
+	    weightsDtype (numpy.dtype): Type used to serialize the weights
+
+	    filename (str): Path of the SQLite database
+	    connection (sqlite3.Connection): Connection to the database
+
+	"""
+	weightsDtype = numpy.dtype('<f8')
+
+	def __init__(self, filename = "hallOfFame.db", timeout = 60.0):
+		"""
+		Open the database, creating the schema if needed
+
+		Args:
+		    filename (str, optional): Path of the SQLite database
+		    timeout (float, optional): Seconds to wait for other writers to release the lock
+		"""
+		self.filename = filename
+		self.connection = sqlite3.connect(filename, timeout = timeout, isolation_level = None)
+		self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("PRAGMA synchronous=NORMAL")
+
+		self.connection.execute("BEGIN IMMEDIATE")
+		try:
+			self.connection.execute("""CREATE TABLE IF NOT EXISTS genomes (
+				genomeHash TEXT PRIMARY KEY,
+				score REAL NOT NULL,
+				executionId TEXT NOT NULL,
+				generation INTEGER NOT NULL,
+				numWeights INTEGER NOT NULL,
+				weights BLOB NOT NULL)""")
+			self.connection.execute("CREATE INDEX IF NOT EXISTS genomesScore ON genomes (score DESC)")
+			self.connection.execute("CREATE INDEX IF NOT EXISTS genomesExecution ON genomes (executionId, score DESC)")
+			self.connection.execute("CREATE INDEX IF NOT EXISTS genomesGeneration ON genomes (generation, score DESC)")
+			self.connection.execute("COMMIT")
+		except:
+			self.connection.execute("ROLLBACK")
+			raise
+
+	def add(self, score, executionId, generation, weights):
+		"""
+		Store a genome, if it is already stored keep the highest score
+
+		Args:
+		    score (float): Score of the genome
+		    executionId (str): Execution that produced the genome
+		    generation (int): Generation that produced the genome
+		    weights (list): Weights of the net
+
+		Returns:
+		    bool: True if the genome was not stored before
+		"""
+		blob = numpy.asarray(weights, dtype = HallOfFame.weightsDtype).tobytes()
+		genomeHash = hashlib.sha1(blob).hexdigest()
+
+		self.connection.execute("BEGIN IMMEDIATE")
+		try:
+			cursor = self.connection.execute("INSERT OR IGNORE INTO genomes VALUES (?, ?, ?, ?, ?, ?)",
+				(genomeHash, score, executionId, generation, len(blob)//HallOfFame.weightsDtype.itemsize, sqlite3.Binary(blob)))
+			inserted = cursor.rowcount == 1
+			if not inserted:
+				self.connection.execute("UPDATE genomes SET score = ?, executionId = ?, generation = ? WHERE genomeHash = ? AND score < ?",
+					(score, executionId, generation, genomeHash, score))
+			self.connection.execute("COMMIT")
+		except:
+			self.connection.execute("ROLLBACK")
+			raise
+
+		return inserted
+
+	def getTop(self, k, executionId = None, generation = None, numWeights = None):
+		"""
+		Returns the k genomes with the highest score
+
+		Args:
+		    k (int): Maximum number of genomes
+		    executionId (str, optional): Only genomes of this execution
+		    generation (int, optional): Only genomes of this generation
+		    numWeights (int, optional): Only genomes with this number of weights
+
+		Returns:
+		    list: (score, executionId, generation, weights) tuples, best first
+		"""
+		conditions = []
+		params = []
+		if executionId is not None:
+			conditions.append("executionId = ?")
+			params.append(executionId)
+		if generation is not None:
+			conditions.append("generation = ?")
+			params.append(generation)
+		if numWeights is not None:
+			conditions.append("numWeights = ?")
+			params.append(numWeights)
+
+		query = "SELECT score, executionId, generation, weights FROM genomes"
+		if conditions:
+			query += " WHERE " + " AND ".join(conditions)
+		query += " ORDER BY score DESC LIMIT ?"
+		params.append(k)
+
+		return [(score, rowExecutionId, rowGeneration, numpy.frombuffer(weights, dtype = HallOfFame.weightsDtype))
+			for score, rowExecutionId, rowGeneration, weights in self.connection.execute(query, params)]
+
+	def __len__(self):
+		"""
+		Returns the number of stored genomes
+
+		Returns:
+		    int: Number of genomes
+		"""
+		return self.connection.execute("SELECT COUNT(*) FROM genomes").fetchone()[0]
+
+	def close(self):
+		"""
+		Close the connection to the database
+		"""
+		self.connection.close()
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Query the hall of fame of the best genomes")
+	parser.add_argument("--db", default = "hallOfFame.db", help = "path of the database (default: hallOfFame.db)")
+	parser.add_argument("--top", type = int, default = 10, help = "number of genomes to show (default: 10)")
+	parser.add_argument("--execution", help = "only genomes of this execution id")
+	parser.add_argument("--generation", type = int, help = "only genomes of this generation")
+	parser.add_argument("--weights", action = "store_true", help = "print the weights too")
+	args = parser.parse_args()
+
+	hallOfFame = HallOfFame(args.db)
+	for score, executionId, generation, weights in hallOfFame.getTop(args.top, args.execution, args.generation):
+		line = str(score) + ";" + executionId + ";" + str(generation)
+		if args.weights:
+			line += ";" + str(weights.tolist())
+		print(line)
+	hallOfFame.close()
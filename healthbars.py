@@ -0,0 +1,147 @@
+from panda3d.core import GeomVertexFormat, GeomVertexData, GeomVertexWriter, GeomTriangles, Geom, GeomNode, OmniBoundingVolume
+
+class HealthBars(object):
+	"""
+	The life bars of all the pandas in a single geometry. Each panda owns a slot of
+	8 vertices (a red and a green quad) that is rewritten on the CPU, facing the
+	camera, only when the panda is marked as dirty, so there is one node and one
+	draw call instead of three nodes per panda.
+
+	Attributes:
+	    verticesPerSlot (int): Vertices of the two quads of a bar
+	    halfHeight (float): Half of the height of a bar
+	    heightOverPanda (float): Height of the bars over the pandas
+
+	    slotNumber (int): Number of slots of the vertex data
+	    slotByPanda (dict): Maps a Panda object to its slot
+	    freeSlotList (list): Slots without panda
+	    dirtyPandas (set): Pandas whose bar must be rewritten
+	    geomNode (GeomNode): Node with the geometry of all the bars
+	    handle (NodePath): Node of the geometry
+
+	"""
+	verticesPerSlot = 8
+	halfHeight = 0.2
+	heightOverPanda = 3.0
+
+	def __init__(self, game, slotNumber):
+		"""
+		Create the geometry
+
+		Args:
+		    game (Game): A reference to the Game object
+		    slotNumber (int): Initial number of slots, it grows when needed
+		"""
+		self.slotNumber = 0
+		self.slotByPanda = {}
+		self.freeSlotList = []
+		self.dirtyPandas = set()
+
+		vertexData = GeomVertexData("healthBars", GeomVertexFormat.getV3c4(), Geom.UHDynamic)
+		geom = Geom(vertexData)
+		geom.addPrimitive(GeomTriangles(Geom.UHStatic))
+		self.geomNode = GeomNode("healthBars")
+		self.geomNode.addGeom(geom)
+		self.geomNode.setBounds(OmniBoundingVolume())
+		self.geomNode.setFinal(True)
+
+		self.handle = game.render.attachNewNode(self.geomNode)
+		self.handle.setLightOff()
+		self.handle.setTwoSided(True)
+
+		self.__grow(slotNumber)
+
+	def __grow(self, slotNumber):
+		"""
+		Add slots to the geometry, the new ones are hidden
+
+		Args:
+		    slotNumber (int): Number of slots after growing
+		"""
+		geom = self.geomNode.modifyGeom(0)
+		vertexData = geom.modifyVertexData()
+		vertexData.setNumRows(slotNumber*HealthBars.verticesPerSlot)
+
+		colorWriter = GeomVertexWriter(vertexData, "color")
+		colorWriter.setRow(self.slotNumber*HealthBars.verticesPerSlot)
+		vertexWriter = GeomVertexWriter(vertexData, "vertex")
+		vertexWriter.setRow(self.slotNumber*HealthBars.verticesPerSlot)
+		triangles = geom.modifyPrimitive(0)
+
+		for slot in range(self.slotNumber, slotNumber):
+			first = slot*HealthBars.verticesPerSlot
+			for quad, color in enumerate(((1, 0, 0, 1), (0, 1, 0, 1))):
+				for corner in range(4):
+					colorWriter.addData4f(*color)
+					vertexWriter.addData3f(0, 0, 0)
+				triangles.addVertices(first + quad*4, first + quad*4 + 1, first + quad*4 + 2)
+				triangles.addVertices(first + quad*4, first + quad*4 + 2, first + quad*4 + 3)
+			self.freeSlotList.append(slot)
+
+		self.freeSlotList.sort(reverse = True)
+		self.slotNumber = slotNumber
+
+	def add(self, panda):
+		"""
+		Give a slot to a panda
+
+		Args:
+		    panda (Panda): The panda
+		"""
+		if not self.freeSlotList:
+			self.__grow(max(1, self.slotNumber*2))
+		self.slotByPanda[panda] = self.freeSlotList.pop()
+		self.dirtyPandas.add(panda)
+
+	def remove(self, panda):
+		"""
+		Hide the bar of a panda and free its slot
+
+		Args:
+		    panda (Panda): The panda
+		"""
+		slot = self.slotByPanda.pop(panda)
+		self.dirtyPandas.discard(panda)
+
+		vertexWriter = GeomVertexWriter(self.geomNode.modifyGeom(0).modifyVertexData(), "vertex")
+		vertexWriter.setRow(slot*HealthBars.verticesPerSlot)
+		for i in range(HealthBars.verticesPerSlot):
+			vertexWriter.setData3f(0, 0, 0)
+		self.freeSlotList.append(slot)
+
+	def markDirty(self, panda):
+		"""
+		Rewrite the bar of a panda in the next update
+
+		Args:
+		    panda (Panda): The panda
+		"""
+		self.dirtyPandas.add(panda)
+
+	def update(self, game):
+		"""
+		Rewrite the bars of the dirty pandas, facing the camera
+
+		Args:
+		    game (Game): A reference to the Game object
+		"""
+		if not self.dirtyPandas:
+			return
+
+		quat = game.camera.getQuat(game.render)
+		right = quat.getRight()
+		up = quat.getUp()*HealthBars.halfHeight
+
+		vertexWriter = GeomVertexWriter(self.geomNode.modifyGeom(0).modifyVertexData(), "vertex")
+		for panda in self.dirtyPandas:
+			center = panda.pandaHandle.getPos(game.render)
+			center.setZ(center.getZ() + HealthBars.heightOverPanda)
+			split = 2.0*panda.health/100.0 - 1.0 #green from -1 to split, red from split to 1
+
+			vertexWriter.setRow(self.slotByPanda[panda]*HealthBars.verticesPerSlot)
+			for left, rightEnd in ((split, 1.0), (-1.0, split)):
+				vertexWriter.setData3f(center + right*left - up)
+				vertexWriter.setData3f(center + right*rightEnd - up)
+				vertexWriter.setData3f(center + right*rightEnd + up)
+				vertexWriter.setData3f(center + right*left + up)
+		self.dirtyPandas.clear()
@@ -0,0 +1,60 @@
+from direct.gui.OnscreenText import OnscreenText
+from panda3d.core import TextNode
+
+import time
+
+class Hud(object):
+	"""
+	UI text lines that are only regenerated when their value changes, and at most
+	maxRefreshRate times per second
+
+	Attributes:
+	    textList (list): OnscreenText of each line
+	    valueList (list): Last value given to each line
+	    shownValueList (list): Value shown by each line
+	    refreshInterval (float): Minimum number of seconds between refreshes
+	    lastRefreshTime (float): Time of the last refresh
+
+	"""
+	def __init__(self, lineNumber, maxRefreshRate = 10.0):
+		"""
+		Create the lines at the top left corner of the window
+
+		Args:
+		    lineNumber (int): Number of lines
+		    maxRefreshRate (float, optional): Maximum number of refreshes per second, 0 for no limit
+		"""
+		self.textList = []
+		for i in range(lineNumber):
+			self.textList.append(OnscreenText(align=TextNode.ALeft, text = '', pos = (-1.7, 0.9 - i*0.1), scale = 0.1, fg = (1,1,1,1)))
+		self.valueList = [''] * lineNumber
+		self.shownValueList = [''] * lineNumber
+		self.refreshInterval = 1.0/maxRefreshRate if maxRefreshRate > 0 else 0.0
+		self.lastRefreshTime = None
+
+	def setLine(self, index, value):
+		"""
+		Set the value of a line, it is shown in the next refresh
+
+		Args:
+		    index (int): Number of the line
+		    value (str): Text of the line
+		"""
+		self.valueList[index] = value
+
+	def refresh(self, force = False):
+		"""
+		Show the lines that changed, if enough time passed since the last refresh
+
+		Args:
+		    force (bool, optional): Refresh even if it is too soon
+		"""
+		now = time.time()
+		if not force and self.lastRefreshTime is not None and now - self.lastRefreshTime < self.refreshInterval:
+			return
+		self.lastRefreshTime = now
+
+		for i in range(len(self.textList)):
+			if self.valueList[i] != self.shownValueList[i]:
+				self.textList[i].setText(self.valueList[i])
+				self.shownValueList[i] = self.valueList[i]
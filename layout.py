@@ -0,0 +1,160 @@
+def getRandomInt(rng, start, stop):
+	"""
+	Returns a random integer like rng.randrange(start, stop) does in Python 2, which
+	Python 3 changed, so a seed places the same world in both
+
+	Args:
+	    rng (random.Random): Random number generator
+	    start (int): Minimum value
+	    stop (int): Maximum value plus 1
+
+	Returns:
+	    int: The integer
+	"""
+	return start + int(rng.random()*(stop - start))
+
+def getWallSpikePositions(gameWidth, gameHeight):
+	"""
+	Returns the positions of the spikes around the world, 8 units apart
+
+	Args:
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+
+	Returns:
+	    list: (x, y) tuples
+	"""
+	positions = []
+	for i in range(-gameWidth//2, gameWidth//2 + 1, 8):
+		positions.append((i, -gameHeight//2))
+		positions.append((i, gameHeight//2))
+	for i in range(-gameHeight//2 + 8, gameHeight//2 + 1 - 8, 8):
+		positions.append((-gameWidth//2, i))
+		positions.append((gameWidth//2, i))
+	return positions
+
+def isFarFrom(x, y, positions, minDistanceSquared = 100):
+	"""
+	Returns True if a point is far enough from all the positions
+
+	Args:
+	    x (float): x coordinate
+	    y (float): y coordinate
+	    positions (list): (x, y) tuples
+	    minDistanceSquared (float, optional): Minimum squared distance
+
+	Returns:
+	    bool: True if there is no position closer than the minimum distance
+	"""
+	for px, py in positions:
+		if (px - x)**2 + (py - y)**2 < minDistanceSquared:
+			return False
+	return True
+
+def placeSpikes(rng, gameWidth, gameHeight, spikeNumber):
+	"""
+	Generate randomly positioned normal spikes in a way that there is
+	a minimum distance between them
+
+	Args:
+	    rng (random.Random): Random number generator
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+	    spikeNumber (int): Number of spikes
+
+	Returns:
+	    list: (x, y) tuples
+	"""
+	spikes = []
+	while len(spikes) < spikeNumber:
+		x = getRandomInt(rng, 10 - gameWidth//2, -10 + gameWidth//2)
+		y = getRandomInt(rng, 10 - gameHeight//2, -10 + gameHeight//2)
+		if isFarFrom(x, y, spikes):
+			spikes.append((x, y))
+	return spikes
+
+def placePandas(rng, gameWidth, gameHeight, pandaNumber, spikes):
+	"""
+	Generate randomly positioned and oriented pandas in a way that there is
+	a minimum distance between them and the spikes
+
+	Args:
+	    rng (random.Random): Random number generator
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+	    pandaNumber (int): Number of pandas
+	    spikes (list): (x, y) of the normal spikes
+
+	Returns:
+	    list: (x, y, h) tuples, h is the heading in degrees
+	"""
+	pandas = []
+	while len(pandas) < pandaNumber:
+		x = getRandomInt(rng, 50 - gameWidth//2, -50 + gameWidth//2)
+		y = getRandomInt(rng, 50 - gameHeight//2, -50 + gameHeight//2)
+		if isFarFrom(x, y, [(px, py) for px, py, h in pandas]) and isFarFrom(x, y, spikes):
+			pandas.append((x, y, getRandomInt(rng, 0, 360)))
+	return pandas
+
+def findCarrotPosition(rng, gameWidth, gameHeight, pandas, spikes, carrots):
+	"""
+	Find a random position for a carrot in a way that there is
+	a minimum distance between it, the spikes, the pandas and the other carrots
+
+	Args:
+	    rng (random.Random): Random number generator
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+	    pandas (list): (x, y) of the pandas that are not dying
+	    spikes (list): (x, y) of the spikes
+	    carrots (list): (x, y) of the active carrots
+
+	Returns:
+	    tuple: (x, y)
+	"""
+	while True:
+		x = getRandomInt(rng, 50 - gameWidth//2, -50 + gameWidth//2)
+		y = getRandomInt(rng, 50 - gameHeight//2, -50 + gameHeight//2)
+		if isFarFrom(x, y, pandas) and isFarFrom(x, y, spikes) and isFarFrom(x, y, carrots):
+			return (x, y)
+
+def placeCarrots(rng, gameWidth, gameHeight, carrotNumber, pandas, spikes):
+	"""
+	Generate randomly positioned carrots like Game does: each carrot is created
+	at the origin, where it is active, and then repositioned
+
+	Args:
+	    rng (random.Random): Random number generator
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+	    carrotNumber (int): Number of carrots
+	    pandas (list): (x, y) of the pandas
+	    spikes (list): (x, y) of the normal spikes
+
+	Returns:
+	    list: (x, y) tuples
+	"""
+	carrots = []
+	for i in range(carrotNumber):
+		carrots.append(findCarrotPosition(rng, gameWidth, gameHeight, pandas, spikes, carrots + [(0, 0)]))
+	return carrots
+
+def generateLayout(rng, gameWidth, gameHeight, spikeNumber, pandaNumber, carrotNumber):
+	"""
+	Generate the positions of a generation in the same order Game does
+
+	Args:
+	    rng (random.Random): Random number generator
+	    gameWidth (int): Width of the world geometry OX plane
+	    gameHeight (int): Height of the world geometry OY plane
+	    spikeNumber (int): Number of normal spikes
+	    pandaNumber (int): Number of pandas
+	    carrotNumber (int): Number of carrots
+
+	Returns:
+	    tuple: (spikes, pandas, carrots), lists of (x, y) and (x, y, h) for the pandas
+	"""
+	spikes = placeSpikes(rng, gameWidth, gameHeight, spikeNumber)
+	pandas = placePandas(rng, gameWidth, gameHeight, pandaNumber, spikes)
+	carrots = placeCarrots(rng, gameWidth, gameHeight, carrotNumber, [(x, y) for x, y, h in pandas], spikes)
+	return (spikes, pandas, carrots)
@@ -1,4 +1,32 @@
 from game import Game
+from config import Config
 
-game = Game()
-game.run()
\ No newline at end of file
+import argparse
+
+parser = argparse.ArgumentParser(description = "3D demonstration of artificial neural networks with genetic algorithms",
+	epilog = "options for --set: " + ", ".join(name for name, optionParser, default, description in Config.fields))
+parser.add_argument("--config", metavar = "FILE", help = "JSON file with the options of the run")
+parser.add_argument("--set", action = "append", default = [], metavar = "NAME=VALUE", help = "override an option, can be repeated")
+parser.add_argument("--run-id", help = "id of the execution, used to name its stats file (default: a random one)")
+parser.add_argument("--headless", action = "store_true", help = "run without a window, UI or visual effects")
+parser.add_argument("--precision", choices = ("float32", "float64"), help = "floating point precision of the networks (default: float32 when headless, float64 otherwise)")
+parser.add_argument("--seed-from", nargs = "+", metavar = "FILE", help = "seed the initial population with the best genomes of hallOfFame.db, bestGenomes.txt, stats or .archive.json files")
+parser.add_argument("--seed-fraction", type = float, help = "fraction of the initial population to seed (default: 0.5)")
+parser.add_argument("--seed-jitter", type = float, help = "standard deviation of the gaussian noise added to the seeds (default: 0.0)")
+args = parser.parse_args()
+
+config = Config.load(args.config) if args.config else Config()
+if args.headless:
+	config.set("headless", True)
+if args.precision is not None:
+	config.set("precision", args.precision)
+if args.seed_from is not None:
+	config.set("seedSources", args.seed_from)
+if args.seed_fraction is not None:
+	config.set("seedFraction", args.seed_fraction)
+if args.seed_jitter is not None:
+	config.set("seedJitter", args.seed_jitter)
+config.override(args.set)
+
+game = Game(config, args.run_id)
+game.run()
@@ -1,9 +1,8 @@
 from math import pi, sin, cos
 from direct.actor.Actor import Actor
 from panda3d.core import *
-from random import randrange
 
-from pybrain.structure import FeedForwardNetwork, TanhLayer, FullConnection
+from brain import Brain
 
 import numpy
 
@@ -17,6 +16,8 @@ class Panda(object):
 	    pandaActorIdle (Actor): Panda3d Actor class
 	    pandaActorWalking (Actor): Panda3d Actor class
 		livingPandas (int): counter of living pandas
+	    totalCarrotsEaten (int): Sum of the scores of the pandas, kept up to date when a carrot is eaten
+	    bestPanda (Panda): The first panda of pandaList with the highest score, kept up to date when a carrot is eaten
 
 		health (float): Amount of health
 	    viewDistance (float): Maximum view distance
@@ -26,12 +27,15 @@ class Panda(object):
 	    isDying (bool): True if health == 0
 	    carrotsEaten (int): Number of carrots eaten by the panda (score)
 	    brainWeights (list): List of weights for the net
-	    network (FeedForwardNetwork): PyBrain Neural Network object
+	    network (Brain): Neural Network object
 		inputNumber (int): Number of view frustums
-	    inputDistanceList (list): float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
-	    inputTypeList (list): -1 spike, 0 nothing, 1 carrot
+	    brainInput (numpy.ndarray): Sensor values fed to the net, distances followed by types
+	    inputDistanceList (numpy.ndarray): View of brainInput, float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
+	    inputTypeList (numpy.ndarray): View of brainInput, -1 spike, 0 nothing, 1 carrot
+	    brainOutput (list): Last outputs of the net, turn and speed
 	    lensNodeList (list): list of the nodes of the frustums
-	    handleLifeBar (NodePath): Node for the life bar
+	    pandaIndex (int): Position of the panda in pandaList
+	    healthBars (HealthBars): The life bars of all the pandas, None when headless
 	    pandaHandle (NodePath): Node for the panda
 	    pandaActorIdleHandle (NodePath): Node for the idle panda animation
 	    pandaActorWalkingHandle (NodePath): Node for the walking panda animation
@@ -42,8 +46,10 @@ class Panda(object):
 	pandaActorIdle = None
 	pandaActorWalking = None
 	livingPandas = 0
+	totalCarrotsEaten = 0
+	bestPanda = None
 
-	def __init__(self, game, x, y, genome):
+	def __init__(self, game, x, y, h, genome):
 		"""
 		Initialize
 		
@@ -51,6 +57,7 @@ class Panda(object):
 		    game (game (Game): A reference to the Game object
 		    x (int): x coordinate
 		    y (int): y coordinate
+		    h (int): heading in degrees
 		    genome (G1DList): PyEvolve's individual container
 		"""
 		if not Panda.pandaActorIdle:
@@ -65,19 +72,20 @@ class Panda(object):
 			Panda.pandaActorWalking.loop("walk")
 
 		self.health = 100.0
-		self.viewDistance = 50.0
-		self.baseSpeed = 1.0
-		self.baseTurnSpeed = 10.0
+		self.viewDistance = game.options.viewDistance
+		self.baseSpeed = game.options.baseSpeed
+		self.baseTurnSpeed = game.options.baseTurnSpeed
 		self.isAlive = True
 		self.isDying = False
 		self.carrotsEaten = 0
 
 		self.lensNodeList = []
-		self.inputNumber = 7 #number of view frustums
-		self.inputDistanceList = [0]*self.inputNumber # float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
-		self.inputTypeList = [0]*self.inputNumber #-1 spike, 0 nothing, 1 carrot
+		self.inputNumber = game.options.frustumNumber #number of view frustums
+		self.brainInput = numpy.zeros(self.inputNumber*2, dtype = Brain.getDtype(game.precision))
+		self.brainOutput = [0.0, 0.0]
+		self.inputDistanceList = self.brainInput[:self.inputNumber] # float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
+		self.inputTypeList = self.brainInput[self.inputNumber:] #-1 spike, 0 nothing, 1 carrot
 
-		h = randrange(0, 360)
 		self.pandaHandle = game.render.attachNewNode("pandaHandle")
 		self.pandaHandle.setPos(x, y, 0)
 		self.pandaHandle.setH(h)
@@ -90,22 +98,22 @@ class Panda(object):
 		self.pandaActorIdleHandle.setPos(0,0,0)
 		Panda.pandaActorWalking.instanceTo(self.pandaActorWalkingHandle)
 
+		self.pandaIndex = len(Panda.pandaList)
 		Panda.pandaList.append(self)
 		Panda.livingPandas += 1
+		if Panda.bestPanda is None:
+			Panda.bestPanda = self
 		
 		Panda.pandaIds[genome.getParam("pandaId")] = self
 		self.brainWeights = genome.genomeList
 
-		self.__setUpLifeBar()
+		self.__setUpLifeBar(game)
 		self.__setUpLens()
-		self.__setUpBrain(genome)
+		self.__setUpBrain(genome, game.options.topology, game.precision)
 
-	def __delete(self, task = None):
+	def __delete(self):
 		"""
 		Free memory allocated by this panda
-		
-		Args:
-		    task (task): Panda3D requires this param
 		"""
 		self.isAlive = False
 
@@ -113,9 +121,8 @@ class Panda(object):
 			node.removeNode()
 		del self.lensNodeList[:]
 
-		self.bgHandle.removeNode()
-		self.fgHandle.removeNode()
-		self.handleLifeBar.removeNode()
+		if self.healthBars:
+			self.healthBars.remove(self)
 
 		self.pandaActorIdleHandle.removeNode()
 		self.pandaActorWalkingHandle.removeNode()
@@ -135,7 +142,7 @@ class Panda(object):
 			self.isDying = True
 			Panda.pandaActorIdle.instanceTo(self.pandaActorIdleHandle)
 			self.pandaActorWalkingHandle.hide()
-			game.taskMgr.doMethodLater(3, self.__delete, 'delete panda')
+			game.scheduler.schedule(game.options.dyingTicks, self.__delete, 'delete panda')
 
 	def __setUpLens(self):
 		"""
@@ -163,27 +170,16 @@ class Panda(object):
 			
 			self.lensNodeList.append(handleLens)
 
-	def __setUpLifeBar(self):
+	def __setUpLifeBar(self, game):
 		"""
 		Set up the life bar
+		
+		Args:
+		    game (Game): A reference to the Game object
 		"""
-		self.handleLifeBar = self.pandaHandle.attachNewNode("lifeBarNode")
-		self.handleLifeBar.setBillboardPointEye()
-		self.handleLifeBar.setPos(0, 0, 3)
-
-		self.bgCard = CardMaker("bg")
-		self.bgCard.setColor(1, 0, 0, 1)
-		self.bgCard.setFrame(-1, 1, -0.2, 0.2)
-		self.bgHandle = self.handleLifeBar.attachNewNode(self.bgCard.generate())
-		self.bgHandle.setPos(0,0,0)
-
-		self.fgCard = CardMaker("fg")
-		self.fgCard.setColor(0, 1, 0, 1)
-		self.fgCard.setFrame(-1, 1, -0.2, 0.2)
-		self.fgHandle = self.handleLifeBar.attachNewNode(self.fgCard.generate())
-		self.fgHandle.setPos(0,0,0)
-
-		self.__updateHealthBar()
+		self.healthBars = game.healthBars
+		if self.healthBars:
+			self.healthBars.add(self)
 
 	def update(self, game, carrots, spikes):
 		"""
@@ -201,11 +197,10 @@ class Panda(object):
 			return
 
 		self.__updateInputs(carrots, spikes)
-		brainInput = self.inputDistanceList + self.inputTypeList
-		brainOutput = self.network.activate(brainInput).tolist()
+		self.brainOutput = self.network.activate(self.brainInput).tolist()
 
-		self.pandaHandle.setH(self.pandaHandle, (brainOutput[0])*self.baseTurnSpeed)
-		self.pandaHandle.setPos(self.pandaHandle, 0, -((brainOutput[1]+1.0)*self.baseSpeed), 0)
+		self.pandaHandle.setH(self.pandaHandle, (self.brainOutput[0])*self.baseTurnSpeed)
+		self.pandaHandle.setPos(self.pandaHandle, 0, -((self.brainOutput[1]+1.0)*self.baseSpeed), 0)
 
 		self.__handleCollisions(game, carrots, spikes)
 		self.__decrementHealth()
@@ -228,8 +223,8 @@ class Panda(object):
 		    carrots (list): list of carrots
 		    spikes (list): list of spikes
 		"""
-		self.inputDistanceList = [self.viewDistance]*self.inputNumber # float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
-		self.inputTypeList = [0]*self.inputNumber #-1 spike, 0 nothing, 1 carrot
+		self.inputDistanceList.fill(self.viewDistance) # float between 1.0 and 0.0; 1.0 -> farther, 0.0 -> closer
+		self.inputTypeList.fill(0) #-1 spike, 0 nothing, 1 carrot
 
 		for i in range(self.inputNumber):
 			carrotDistances = []
@@ -276,18 +271,15 @@ class Panda(object):
 			if self.inputDistanceList[i] > self.viewDistance:
 				self.inputDistanceList[i] = self.viewDistance
 
-		self.inputDistanceList = [float(i)/self.viewDistance for i in self.inputDistanceList] #normalize the distances
+		self.inputDistanceList /= self.viewDistance #normalize the distances
 		#print([round(i, 2) for i in self.inputDistanceList])
 
 	def __updateHealthBar(self):
 		"""
-		Update health bar
+		Update health bar, it is redrawn with the others by HealthBars.update
 		"""
-		self.bgHandle.setScale(1.0 - self.health/100.0, 1, 1)
-		self.bgHandle.setPos((self.health/100.0),0,0)
-
-		self.fgHandle.setScale(self.health/100.0, 1, 1)
-		self.fgHandle.setPos(-(1.0 - (self.health/100.0)),0,0)
+		if self.healthBars:
+			self.healthBars.markDirty(self)
 
 	def __handleCollisions(self, game, carrots, spikes):
 		"""
@@ -321,41 +313,25 @@ class Panda(object):
 		Increment score and life points
 		"""
 		self.carrotsEaten += 1
+		Panda.totalCarrotsEaten += 1
+		best = Panda.bestPanda
+		if self.carrotsEaten > best.carrotsEaten or (self.carrotsEaten == best.carrotsEaten and self.pandaIndex < best.pandaIndex):
+			Panda.bestPanda = self
+
 		self.health += 40.0
 		if self.health > 100.0:
 			self.health = 100.0
 
-	def __setUpBrain(self, genome):
+	def __setUpBrain(self, genome, topology, precision):
 		"""
-		Set up PyBrain's neural network
+		Set up the neural network
 		
 		Args:
 		    genome (G1DList): PyEvolve's individual container
+		    topology (tuple): Number of neurons of each layer
+		    precision (str): 'float32' or 'float64'
 		"""
-		self.network = FeedForwardNetwork()
-
-		inLayer = TanhLayer(14)
-		hiddenLayer = TanhLayer(12)
-		hiddenLayer2 = TanhLayer(6)
-		outLayer = TanhLayer(2)
-		
-		self.network.addInputModule(inLayer)
-		self.network.addModule(hiddenLayer)
-		self.network.addModule(hiddenLayer2)
-		self.network.addOutputModule(outLayer)
-		
-		in_to_hidden = FullConnection(inLayer, hiddenLayer)
-		hidden_to_hidden2 = FullConnection(hiddenLayer, hiddenLayer2)
-		hidden2_to_out = FullConnection(hiddenLayer2, outLayer)
-		
-		self.network.addConnection(in_to_hidden)
-		self.network.addConnection(hidden_to_hidden2)
-		self.network.addConnection(hidden2_to_out)
-		
-		self.network.sortModules()
-
-		new_params = numpy.array(genome.genomeList)
-		self.network._setParameters(new_params)
+		self.network = Brain(genome.genomeList, topology, precision)
 
 	@staticmethod
 	def getBestPanda():
@@ -365,11 +341,7 @@ class Panda(object):
 		Returns:
 		    Panda: panda with the highest score
 		"""
-		best = Panda.pandaList[0]
-		for panda in Panda.pandaList:
-			if best.carrotsEaten < panda.carrotsEaten:
-				best = panda
-		return best
+		return Panda.bestPanda
 
 	@staticmethod
 	def getAvgScore():
@@ -379,11 +351,7 @@ class Panda(object):
 		Returns:
 		    float: Average score
 		"""
-		avg = 0.0
-		for panda in Panda.pandaList:
-			avg += panda.carrotsEaten
-		avg = avg / len(Panda.pandaList)
-		return round(avg,3)
+		return round(float(Panda.totalCarrotsEaten) / len(Panda.pandaList), 3)
 
 	@staticmethod
 	def clearPandas(game):
@@ -393,13 +361,15 @@ class Panda(object):
 		Args:
 		    game (Game): A reference to the Game object
 		"""
-		game.taskMgr.remove('delete panda')
+		game.scheduler.cancel('delete panda')
 
 		for panda in Panda.pandaList[:]:
 			if panda.isAlive:
 				panda.__delete()
 		del Panda.pandaList[:]
 		Panda.pandaIds.clear()
+		Panda.totalCarrotsEaten = 0
+		Panda.bestPanda = None
 
 	@staticmethod
 	def getScoreById(pandaId):
@@ -0,0 +1,62 @@
+import heapq
+
+class TickScheduler(object):
+	"""
+	Event queue keyed by simulation tick, it replaces the wall clock timers of
+	Panda3D's task manager so the delayed events (carrot respawns and
+	the removal of dead pandas) happen at the same tick whatever the frame rate is
+
+	Attributes:
+	    currentTick (int): Number of ticks advanced so far
+	    events (list): Heap of (tick, order, tag, callback, args)
+	    scheduledNumber (int): Number of events scheduled so far, breaks the ties of the heap
+
+	"""
+	def __init__(self):
+		"""
+		Initialize
+		"""
+		self.currentTick = 0
+		self.events = []
+		self.scheduledNumber = 0
+
+	def schedule(self, delay, callback, tag = None, args = ()):
+		"""
+		Schedule a call, events of the same tick run in the order they were scheduled
+
+		Args:
+		    delay (int): Number of ticks from now, 0 runs it as soon as possible
+		    callback (function): Function to call
+		    tag (str, optional): Name used to cancel the event
+		    args (tuple, optional): Arguments of the call
+		"""
+		self.scheduledNumber += 1
+		heapq.heappush(self.events, (self.currentTick + max(delay, 0), self.scheduledNumber, tag, callback, tuple(args)))
+
+	def cancel(self, tag):
+		"""
+		Remove all the pending events with a tag
+
+		Args:
+		    tag (str): Name of the events
+		"""
+		self.events = [event for event in self.events if event[2] != tag]
+		heapq.heapify(self.events)
+
+	def advance(self):
+		"""
+		Go to the next tick and run the events that are due
+		"""
+		self.currentTick += 1
+		while self.events and self.events[0][0] <= self.currentTick:
+			tick, order, tag, callback, args = heapq.heappop(self.events)
+			callback(*args)
+
+	def __len__(self):
+		"""
+		Returns the number of pending events
+
+		Returns:
+		    int: Number of events
+		"""
+		return len(self.events)
@@ -0,0 +1,207 @@
+import numpy
+
+def getAverageRanks(fitness):
+	"""
+	Rank of each individual from 0, the worst, to n - 1, the best, the individuals
+	with the same score share the average of their ranks
+
+	Args:
+	    fitness (numpy.ndarray): Score of each individual
+
+	Returns:
+	    numpy.ndarray: The ranks
+	"""
+	values, inverse, counts = numpy.unique(fitness, return_inverse = True, return_counts = True)
+	firstRanks = numpy.cumsum(counts) - counts
+	return (firstRanks + (counts - 1)/2.0)[inverse.ravel()]
+
+def drawIndices(rng, weights, count):
+	"""
+	Draw individuals with probabilities proportional to their weights
+
+	Args:
+	    rng (numpy.random.RandomState): Random number generator
+	    weights (numpy.ndarray): Weight of each individual, not negative and not all 0
+	    count (int): Number of individuals to select
+
+	Returns:
+	    numpy.ndarray: Indices of the selected individuals
+	"""
+	return numpy.minimum(numpy.searchsorted(numpy.cumsum(weights/float(weights.sum())), rng.random_sample(count), side = 'right'), len(weights) - 1)
+
+def proportionalSelection(rng, fitness, count):
+	"""
+	Selection proportional to the raw score, uniform when every score is 0
+
+	Args:
+	    rng (numpy.random.RandomState): Random number generator
+	    fitness (numpy.ndarray): Score of each individual, not negative
+	    count (int): Number of individuals to select
+
+	Returns:
+	    numpy.ndarray: Indices of the selected individuals
+	"""
+	if fitness.sum() <= 0:
+		return rng.randint(0, len(fitness), count)
+	return drawIndices(rng, fitness, count)
+
+def tournamentSelection(rng, fitness, count, size = 3):
+	"""
+	The best of `size` individuals picked uniformly, a tie between the best ones is
+	broken randomly in each tournament, O(count*size)
+
+	Args:
+	    rng (numpy.random.RandomState): Random number generator
+	    fitness (numpy.ndarray): Score of each individual
+	    count (int): Number of individuals to select
+	    size (int, optional): Individuals per tournament
+
+	Returns:
+	    numpy.ndarray: Indices of the selected individuals
+	"""
+	contestants = rng.randint(0, len(fitness), (count, size))
+	scores = fitness[contestants]
+	isBest = scores == scores.max(axis = 1)[:, numpy.newaxis]
+	return contestants[numpy.arange(count), numpy.where(isBest, rng.random_sample((count, size)), -1.0).argmax(axis = 1)]
+
+def rankSelection(rng, fitness, count, pressure = 1.7):
+	"""
+	Linear ranking, the probability of an individual depends only on its rank:
+	the best one is selected `pressure` times the average, the worst one 2 - pressure
+	times, and the individuals with the same score have the same probability
+
+	Args:
+	    rng (numpy.random.RandomState): Random number generator
+	    fitness (numpy.ndarray): Score of each individual
+	    count (int): Number of individuals to select
+	    pressure (float, optional): Between 1 (uniform) and 2
+
+	Returns:
+	    numpy.ndarray: Indices of the selected individuals
+	"""
+	individuals = len(fitness)
+	if individuals == 1:
+		return numpy.zeros(count, dtype = int)
+	weights = (2.0 - pressure) + 2.0*(pressure - 1.0)*getAverageRanks(fitness)/(individuals - 1)
+	if weights.sum() <= 0: #pressure 2 and every score equal
+		return rng.randint(0, individuals, count)
+	return drawIndices(rng, weights, count)
+
+def truncationSelection(rng, fitness, count, fraction = 0.5):
+	"""
+	Uniform selection among the best `fraction` of the population, when a group of
+	individuals with the same score straddles the cut its places are shared evenly
+
+	Args:
+	    rng (numpy.random.RandomState): Random number generator
+	    fitness (numpy.ndarray): Score of each individual
+	    count (int): Number of individuals to select
+	    fraction (float, optional): Fraction of the population that can be selected
+
+	Returns:
+	    numpy.ndarray: Indices of the selected individuals
+	"""
+	individuals = len(fitness)
+	parents = max(1, int(round(fraction*individuals)))
+	values, inverse, counts = numpy.unique(fitness, return_inverse = True, return_counts = True)
+	lastRanks = numpy.cumsum(counts)
+	selectedPlaces = numpy.clip(lastRanks - (individuals - parents), 0, counts) #places of each group among the best ones
+	return drawIndices(rng, (selectedPlaces/counts.astype(float))[inverse.ravel()], count)
+
+selections = {
+	'proportional': proportionalSelection,
+	'tournament': tournamentSelection,
+	'rank': rankSelection,
+	'truncation': truncationSelection,
+}
+
+selectorNames = ('roulette',) + tuple(sorted(selections)) #roulette is PyEvolve's GRouletteWheel, on the linearly scaled fitness
+
+class FitnessSelector(object):
+	"""
+	PyEvolve selector that draws the parents of a whole generation at once from the
+	array of scores, instead of searching the population for each parent. It is
+	called once per parent with the same popID during a generation, like the
+	roulette wheel of PyEvolve caches its wheel. GSimpleGA.step selects n + n%2 + 1
+	parents per generation, asking for more raises an error instead of reusing the
+	draws of the generation.
+
+	Attributes:
+	    selection (function): One of selections, (rng, fitness, count, **options) -> indices
+	    options (dict): Extra arguments of the selection
+	    rng (numpy.random.RandomState): Random number generator
+	    popID (int): Generation of the drawn parents
+	    parents (list): Indices of the parents not yet returned
+
+	"""
+	def __init__(self, name, rng = None, **options):
+		"""
+		Initialize
+
+		Args:
+		    name (str): Key of selections
+		    rng (numpy.random.RandomState, optional): Random number generator, numpy's global one if None
+		    **options: Extra arguments of the selection, like size, pressure or fraction
+		"""
+		self.selection = selections[name]
+		self.options = options
+		self.rng = rng if rng is not None else numpy.random
+		self.popID = None
+		self.parents = []
+
+	def __call__(self, population, **args):
+		"""
+		Select one individual
+
+		Args:
+		    population (GPopulation): The evaluated population
+		    **args: popID, the current generation
+
+		Returns:
+		    G1DList: The selected individual
+		"""
+		if args.get("popID") != self.popID:
+			self.popID = args.get("popID")
+			fitness = numpy.array([individual.score for individual in population], dtype = numpy.float64)
+			count = len(fitness) + len(fitness) % 2 + 1 #2 per pair, 2 more for an odd population and 1 for PyEvolve's check of the crossover
+			self.parents = self.selection(self.rng, fitness, count, **self.options).tolist()[::-1]
+		elif not self.parents:
+			raise RuntimeError("GSimpleGA.step selected more than %d parents in generation %s, FitnessSelector draws them all at once" % (len(population) + len(population) % 2 + 1, self.popID))
+		return population[self.parents.pop()]
+
+class SteadyStateReplacement(object):
+	"""
+	Keeps the best individuals of a generation and only replaces the worst ones with
+	offspring, instead of replacing the whole population
+
+	Attributes:
+	    replaceNumber (int): Number of individuals replaced each generation
+
+	"""
+	def __init__(self, replaceNumber):
+		"""
+		Initialize
+
+		Args:
+		    replaceNumber (int): Number of individuals replaced each generation, 0 for generational replacement
+		"""
+		self.replaceNumber = replaceNumber
+
+	def step(self, ga):
+		"""
+		Evolve one generation, use it instead of GSimpleGA.step
+
+		Args:
+		    ga (GSimpleGA): PyEvolve's Genetic Algorithm object
+		"""
+		individuals = len(ga.internalPop)
+		if self.replaceNumber <= 0 or self.replaceNumber >= individuals:
+			ga.step()
+			return
+
+		ga.internalPop.evaluate()
+		fitness = numpy.array([individual.score for individual in ga.internalPop], dtype = numpy.float64)
+		survivors = [ga.internalPop[index] for index in numpy.argsort(-fitness, kind = 'mergesort')[:individuals - self.replaceNumber]]
+		ga.step()
+		ga.internalPop.internalPop[:] = survivors + ga.internalPop.internalPop[:self.replaceNumber]
+		ga.internalPop.clearFlags()
@@ -0,0 +1,194 @@
+from world import HeadlessWorld
+import layout
+
+import multiprocessing, random
+
+import numpy
+
+try:
+	from multiprocessing import shared_memory
+except ImportError:
+	shared_memory = None #Python < 3.8, the buffer is a multiprocessing.RawArray inherited by the workers
+
+workerState = {}
+
+def getArraySpecs(config, scenarioNumber):
+	"""
+	Names, shapes and types of the shared arrays
+
+	Args:
+	    config (Config): Options of the run
+	    scenarioNumber (int): Number of worlds per generation
+
+	Returns:
+	    list: (name, shape, dtype) of each array
+	"""
+	return [
+		('weights', (config.pandaNumber, config.numNeurons), numpy.float64),
+		('seeds', (scenarioNumber,), numpy.int64),
+		('spikes', (scenarioNumber, config.spikeNumber, 2), numpy.float64),
+		('pandas', (scenarioNumber, config.pandaNumber, 3), numpy.float64),
+		('carrots', (scenarioNumber, config.carrotNumber, 2), numpy.float64),
+		('results', (scenarioNumber, config.pandaNumber, 2), numpy.int64),
+	]
+
+def getArrayViews(buffer, specs):
+	"""
+	Numpy arrays over consecutive, 8 byte aligned, regions of a buffer
+
+	Args:
+	    buffer (buffer): Shared memory
+	    specs (list): (name, shape, dtype) of each array
+
+	Returns:
+	    dict: Maps the name of each array to the array
+	"""
+	arrays = {}
+	offset = 0
+	for name, shape, dtype in specs:
+		count = int(numpy.prod(shape))
+		arrays[name] = numpy.frombuffer(buffer, dtype = dtype, count = count, offset = offset).reshape(shape)
+		offset += (count*numpy.dtype(dtype).itemsize + 7)//8*8
+	return arrays
+
+def getBufferSize(specs):
+	"""
+	Bytes needed by the shared arrays
+
+	Args:
+	    specs (list): (name, shape, dtype) of each array
+
+	Returns:
+	    int: The size
+	"""
+	return max(8, sum((int(numpy.prod(shape))*numpy.dtype(dtype).itemsize + 7)//8*8 for name, shape, dtype in specs))
+
+def initWorker(config, specs, memory):
+	"""
+	Attach a pool worker to the shared arrays
+
+	Args:
+	    config (Config): Options of the run
+	    specs (list): (name, shape, dtype) of each array
+	    memory (str or RawArray): Name of the shared memory block, or the RawArray itself
+	"""
+	if shared_memory is not None:
+		memory = shared_memory.SharedMemory(name = memory)
+		workerState['memory'] = memory #keep it open while the views are used
+		buffer = memory.buf
+	else:
+		buffer = memory
+	workerState['config'] = config
+	workerState['arrays'] = getArrayViews(buffer, specs)
+
+def simulateScenario(config, arrays, scenario):
+	"""
+	Simulate the shared population in one of the shared layouts and write the
+	carrots eaten and the survival of each panda to the shared results
+
+	Args:
+	    config (Config): Options of the run
+	    arrays (dict): The shared arrays
+	    scenario (int): Index of the layout
+	"""
+	scenarioLayout = (arrays['spikes'][scenario].tolist(), arrays['pandas'][scenario].tolist(), arrays['carrots'][scenario].tolist())
+	world = HeadlessWorld(config, list(arrays['weights']), random.Random(int(arrays['seeds'][scenario])), scenarioLayout)
+	world.run()
+	arrays['results'][scenario, :, 0] = world.carrotsEaten
+	arrays['results'][scenario, :, 1] = ~world.isDying
+
+def evaluateScenario(scenario):
+	"""
+	Pool worker, simulate one of the shared layouts
+
+	Args:
+	    scenario (int): Index of the layout
+	"""
+	simulateScenario(workerState['config'], workerState['arrays'], scenario)
+
+class SharedEvaluator(object):
+	"""
+	Simulates each generation of a headless population in several worlds, spread
+	over a pool of processes. The weights of the population, the layouts of the
+	worlds and the results live in one block of shared memory that the workers
+	attach to once, so each generation only sends the index of each world to the
+	workers and waits for all of them, nothing is pickled.
+
+	Attributes:
+	    config (Config): Options of the run
+	    scenarioNumber (int): Number of worlds per generation
+	    jobs (int): Number of processes, 1 to simulate the worlds in this process
+	    memory (SharedMemory or RawArray): The shared block
+	    arrays (dict): Maps weights, seeds, spikes, pandas, carrots and results to views of the block
+	    pool (multiprocessing.Pool): The workers, None when jobs is 1
+
+	"""
+	def __init__(self, config, scenarioNumber = 1, jobs = 1):
+		"""
+		Initialize
+
+		Args:
+		    config (Config): Options of the run
+		    scenarioNumber (int, optional): Number of worlds per generation
+		    jobs (int, optional): Number of processes, 1 to simulate the worlds in this process
+		"""
+		self.config = config
+		self.scenarioNumber = scenarioNumber
+		self.jobs = min(jobs, scenarioNumber)
+
+		specs = getArraySpecs(config, scenarioNumber)
+		if shared_memory is not None:
+			self.memory = shared_memory.SharedMemory(create = True, size = getBufferSize(specs))
+			buffer = self.memory.buf
+			memory = self.memory.name
+		else:
+			self.memory = multiprocessing.RawArray('b', getBufferSize(specs))
+			buffer = memory = self.memory
+		self.arrays = getArrayViews(buffer, specs)
+
+		self.pool = None
+		if self.jobs > 1:
+			self.pool = multiprocessing.Pool(self.jobs, initWorker, (config, specs, memory))
+
+	def evaluate(self, genomes, rng):
+		"""
+		Simulate a generation in new worlds
+
+		Args:
+		    genomes (list): Weights of each individual
+		    rng (random.Random): Random number generator of the layouts and the seeds of the worlds
+
+		Returns:
+		    tuple: (carrots eaten, survived) (worlds, individuals) arrays
+		"""
+		config = self.config
+		self.arrays['weights'][:] = genomes
+		for scenario in range(self.scenarioNumber):
+			spikes, pandas, carrots = layout.generateLayout(rng, config.gameWidth, config.gameHeight, config.spikeNumber, config.pandaNumber, config.carrotNumber)
+			self.arrays['spikes'][scenario] = numpy.reshape(spikes, (config.spikeNumber, 2))
+			self.arrays['pandas'][scenario] = numpy.reshape(pandas, (config.pandaNumber, 3))
+			self.arrays['carrots'][scenario] = numpy.reshape(carrots, (config.carrotNumber, 2))
+			self.arrays['seeds'][scenario] = rng.getrandbits(62)
+
+		if self.pool:
+			self.pool.map(evaluateScenario, range(self.scenarioNumber), chunksize = 1)
+		else:
+			for scenario in range(self.scenarioNumber):
+				simulateScenario(config, self.arrays, scenario)
+
+		results = self.arrays['results']
+		return (results[:, :, 0].copy(), results[:, :, 1].astype(bool))
+
+	def close(self):
+		"""
+		Stop the workers and free the shared memory
+		"""
+		if self.pool:
+			self.pool.terminate()
+			self.pool.join()
+			self.pool = None
+		self.arrays = {}
+		if shared_memory is not None and self.memory is not None:
+			self.memory.close()
+			self.memory.unlink()
+		self.memory = None
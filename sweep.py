@@ -0,0 +1,285 @@
+from config import Config
+from analyze import iterGenerationStats
+
+import argparse, hashlib, itertools, json, multiprocessing, os, subprocess, sys, time
+
+def expandGrid(sweep):
+	"""
+	Expand the parameter grid of a sweep into the list of its runs
+
+	Args:
+	    sweep (dict): {"base": {options}, "grid": {option: [values]}, "repeats": int}
+
+	Returns:
+	    list: (runId, options) pairs, the id depends only on the options and the repeat,
+	    a seed that is not 0 is increased by the repeat so each repeat places other worlds
+	"""
+	base = sweep.get("base", {})
+	grid = sweep.get("grid", {})
+	names = sorted(grid)
+	runs = []
+	for values in itertools.product(*[grid[name] for name in names]):
+		for repeat in range(sweep.get("repeats", 1)):
+			options = dict(base)
+			options.update(zip(names, values))
+			if options.get("seed"):
+				options["seed"] = int(options["seed"]) + repeat
+			Config(**options) #fail before launching anything if an option is wrong
+			key = json.dumps([options, repeat], sort_keys = True)
+			runs.append(("run" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12], options))
+	return runs
+
+def getAvailableMemory():
+	"""
+	Returns the memory that can be used by new processes
+
+	Returns:
+	    float: Available memory in MB, None if it is unknown
+	"""
+	try:
+		with open("/proc/meminfo") as fh:
+			for line in fh:
+				if line.startswith("MemAvailable:"):
+					return int(line.split()[1])/1024.0
+	except IOError:
+		pass
+	try:
+		return os.sysconf("SC_PAGE_SIZE")*os.sysconf("SC_AVPHYS_PAGES")/(1024.0*1024.0)
+	except (ValueError, OSError, AttributeError):
+		return None
+
+def summarizeRun(statsFilename):
+	"""
+	Summarize the stats file of a run, streaming it
+
+	Args:
+	    statsFilename (str): Path of the file
+
+	Returns:
+	    dict: Number of generations, best score, and average score of the first, best and last generation
+	"""
+	generationNumber = 0
+	bestScore = None
+	averages = []
+	for stats in iterGenerationStats(statsFilename, False):
+		generationNumber += 1
+		bestScore = stats.maxScore if bestScore is None else max(bestScore, stats.maxScore)
+		averages.append(stats.getMean())
+
+	if not generationNumber:
+		return {}
+
+	return {
+		"generations": generationNumber,
+		"bestScore": bestScore,
+		"firstAvgScore": round(averages[0], 3),
+		"bestAvgScore": round(max(averages), 3),
+		"lastAvgScore": round(averages[-1], 3),
+	}
+
+class Sweep(object):
+	"""
+	Runs every combination of a parameter grid as a headless execution of main.py,
+	keeping a bounded number of processes so the cores are busy but not oversubscribed
+
+	The sweep directory holds the options of each run (runs/<runId>.json), its output
+	(runs/<runId>.log), a marker written when it finishes (runs/<runId>.done), the stats
+	files (stats/<runId>.txt), the hall of fame of the runs (hallOfFame.db) and the
+	aggregated summary.csv. Running the same sweep again skips the finished runs and
+	restarts the incomplete ones.
+
+	Attributes:
+	    summaryColumns (list): Columns of summary.csv after the grid options
+
+	    directory (str): Sweep directory
+	    runs (list): (runId, options) pairs
+	    gridNames (list): Names of the options of the grid
+	    jobs (int): Maximum number of simultaneous runs
+	    memoryPerRun (float): Memory reserved for each run in MB
+	    memoryLimit (float): Memory that the runs can use in MB, None to use what is available
+
+	"""
+	summaryColumns = ["generations", "bestScore", "firstAvgScore", "bestAvgScore", "lastAvgScore"]
+
+	def __init__(self, directory, sweep, jobs = None, memoryPerRun = 512.0, memoryLimit = None):
+		"""
+		Initialize
+
+		Args:
+		    directory (str): Sweep directory
+		    sweep (dict): {"base": {options}, "grid": {option: [values]}, "repeats": int}
+		    jobs (int, optional): Maximum number of simultaneous runs, by default the number of CPUs
+		    memoryPerRun (float, optional): Memory reserved for each run in MB
+		    memoryLimit (float, optional): Memory that the runs can use in MB, by default what is available
+		"""
+		self.directory = os.path.abspath(directory)
+		self.runs = expandGrid(sweep)
+		self.gridNames = sorted(sweep.get("grid", {}))
+		self.jobs = jobs if jobs else multiprocessing.cpu_count()
+		self.memoryPerRun = memoryPerRun
+		self.memoryLimit = memoryLimit
+
+		for subdirectory in ("runs", "stats"):
+			if not os.path.exists(os.path.join(self.directory, subdirectory)):
+				os.makedirs(os.path.join(self.directory, subdirectory))
+
+	def __getPath(self, *parts):
+		"""
+		Returns a path inside the sweep directory
+
+		Args:
+		    *parts: Path components
+
+		Returns:
+		    str: The path
+		"""
+		return os.path.join(self.directory, *parts)
+
+	def __getMemoryBudget(self):
+		"""
+		Returns the memory that the runs can share, read while none of them is running
+		so the memory they will allocate is not counted as free
+
+		Returns:
+		    float: Memory in MB, None if it is unknown and there is no limit
+		"""
+		availableMemory = getAvailableMemory()
+		if self.memoryLimit is None:
+			return availableMemory
+		if availableMemory is None:
+			return self.memoryLimit
+		return min(self.memoryLimit, availableMemory)
+
+	def __canStartRun(self, runningNumber, memoryBudget):
+		"""
+		Returns True if there is a free CPU and, with memoryPerRun reserved for each
+		run in progress, enough memory for another run
+
+		Args:
+		    runningNumber (int): Number of runs in progress
+		    memoryBudget (float): Memory that the runs can share in MB, None if it is unknown
+
+		Returns:
+		    bool: True if a new run can start
+		"""
+		if runningNumber >= self.jobs:
+			return False
+		if memoryBudget is not None and (runningNumber + 1)*self.memoryPerRun > memoryBudget:
+			return runningNumber == 0
+		return True
+
+	def __startRun(self, runId, options):
+		"""
+		Launch a headless execution of main.py
+
+		Args:
+		    runId (str): Id of the run
+		    options (dict): Options of the run
+
+		Returns:
+		    subprocess.Popen: The process
+		"""
+		config = Config(**options)
+		config.set("headless", True)
+		config.set("statsDirectory", self.__getPath("stats"))
+		config.set("hallOfFameFile", self.__getPath("hallOfFame.db"))
+		config.save(self.__getPath("runs", runId + ".json"))
+
+		statsFilename = self.__getPath("stats", runId + ".txt")
+		if os.path.exists(statsFilename):
+			os.remove(statsFilename) #stats of an incomplete run
+
+		env = dict(os.environ)
+		for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+			env[variable] = "1" #one core per run
+
+		repositoryDirectory = os.path.dirname(os.path.abspath(__file__))
+		log = open(self.__getPath("runs", runId + ".log"), "w")
+		process = subprocess.Popen([sys.executable, os.path.join(repositoryDirectory, "main.py"),
+			"--config", self.__getPath("runs", runId + ".json"), "--run-id", runId],
+			cwd = repositoryDirectory, env = env, stdout = log, stderr = subprocess.STDOUT)
+		log.close()
+		return process
+
+	def getPendingRuns(self):
+		"""
+		Returns the runs that have not finished
+
+		Returns:
+		    list: (runId, options) pairs
+		"""
+		return [(runId, options) for runId, options in self.runs if not os.path.exists(self.__getPath("runs", runId + ".done"))]
+
+	def run(self, pollInterval = 1.0):
+		"""
+		Execute the pending runs and write the summary
+
+		Args:
+		    pollInterval (float, optional): Seconds between checks of the running processes
+
+		Returns:
+		    int: Number of failed runs
+		"""
+		pending = self.getPendingRuns()
+		memoryBudget = self.__getMemoryBudget()
+		maxRunning = self.jobs if memoryBudget is None else max(1, min(self.jobs, int(memoryBudget//self.memoryPerRun)))
+		print("%d runs, %d pending, up to %d at a time" % (len(self.runs), len(pending), maxRunning))
+
+		running = {}
+		failed = 0
+		while pending or running:
+			if not running:
+				memoryBudget = self.__getMemoryBudget()
+			while pending and self.__canStartRun(len(running), memoryBudget):
+				runId, options = pending.pop(0)
+				running[runId] = self.__startRun(runId, options)
+
+			time.sleep(pollInterval)
+
+			for runId, process in list(running.items()):
+				if process.poll() is None:
+					continue
+				del running[runId]
+				if process.returncode == 0:
+					open(self.__getPath("runs", runId + ".done"), "w").close()
+				else:
+					failed += 1
+				print("%s finished with exit code %d, %d pending, %d running" % (runId, process.returncode, len(pending), len(running)))
+
+		self.writeSummary()
+		return failed
+
+	def writeSummary(self):
+		"""
+		Aggregate the stats of the finished runs into summary.csv
+		"""
+		fh = open(self.__getPath("summary.csv"), "w")
+		fh.write(",".join(["runId"] + self.gridNames + Sweep.summaryColumns) + "\n")
+		for runId, options in self.runs:
+			statsFilename = self.__getPath("stats", runId + ".txt")
+			if not os.path.exists(self.__getPath("runs", runId + ".done")) or not os.path.exists(statsFilename):
+				continue
+			summary = summarizeRun(statsFilename)
+			row = [runId] + [json.dumps(options[name]).replace(",", ";") for name in self.gridNames]
+			row += [str(summary.get(column, "")) for column in Sweep.summaryColumns]
+			fh.write(",".join(row) + "\n")
+		fh.close()
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description = "Run a grid of headless executions and summarize them",
+		epilog = 'the sweep file is JSON: {"base": {"maxGenerations": 64}, "grid": {"mutationRate": [0.01, 0.05], "pandaNumber": [8, 32]}, "repeats": 3}')
+	parser.add_argument("sweep", help = "JSON file with the base options, the grid and the number of repeats")
+	parser.add_argument("directory", help = "directory of the sweep, running it again resumes it")
+	parser.add_argument("--jobs", type = int, help = "maximum number of simultaneous runs (default: number of CPUs)")
+	parser.add_argument("--memory-per-run", type = float, default = 512.0, help = "memory reserved for each run in MB (default: 512)")
+	parser.add_argument("--memory-limit", type = float, help = "memory that the runs can use in MB (default: the available memory)")
+	parser.add_argument("--summary-only", action = "store_true", help = "only aggregate the finished runs")
+	args = parser.parse_args()
+
+	with open(args.sweep) as fh:
+		sweep = Sweep(args.directory, json.load(fh), args.jobs, args.memory_per_run, args.memory_limit)
+
+	if args.summary_only:
+		sweep.writeSummary()
+	else:
+		sys.exit(1 if sweep.run() else 0)
@@ -0,0 +1,89 @@
+from analyze import GenerationStats, ConvergenceCurve, iterGenerationStats, summarizeBestGenomes, writeRows
+
+import io, itertools, json, math
+
+import numpy
+import pytest
+
+def writeStatsFile(path, generations):
+	"""
+	A stats file, each line is "generation;score;[weights]"
+	"""
+	with open(str(path), "w") as fh:
+		for generation, individuals in enumerate(generations):
+			for score, weights in individuals:
+				fh.write(str(generation) + ";" + str(score) + ";" + str([float(weight) for weight in weights]) + "\n")
+
+def getRmsWeightDistance(genomeMatrix):
+	"""
+	Root mean square distance per weight over every pair, computed pair by pair
+	"""
+	squaredDistances = [((a - b)**2).sum() for a, b in itertools.combinations(genomeMatrix, 2)]
+	return math.sqrt(numpy.mean(squaredDistances)/genomeMatrix.shape[1])
+
+def test_generation_stats():
+	genomeMatrix = numpy.random.RandomState(0).uniform(-3.0, 3.0, (8, 20))
+	scores = [0.0, 3.0, 1.0, 3.0, 4.0, 0.0, 3.0, 2.0]
+	stats = GenerationStats("run", 2)
+	for score, weights in zip(scores, genomeMatrix):
+		stats.add(score, weights)
+
+	row = stats.toDict()
+	assert (row["count"], row["min"], row["max"], row["median"]) == (8, 0.0, 4.0, 2.0)
+	assert row["mean"] == pytest.approx(numpy.mean(scores), abs = 1e-4)
+	assert row["std"] == pytest.approx(numpy.std(scores), abs = 1e-4)
+	assert row["histogram"] == {"0.0": 2, "1.0": 1, "2.0": 1, "3.0": 3, "4.0": 1}
+	assert stats.getDiversity() == pytest.approx(getRmsWeightDistance(genomeMatrix), rel = 1e-9)
+	assert row["rmsWeightDistance"] == round(stats.getDiversity(), 4)
+
+def test_diversity_needs_weights_and_two_genomes():
+	stats = GenerationStats("run", 0)
+	stats.add(1.0, numpy.ones(3))
+	assert stats.getDiversity() is None
+	stats = GenerationStats("run", 0)
+	stats.add(1.0)
+	stats.add(2.0)
+	assert stats.toDict()["rmsWeightDistance"] is None
+
+def test_iter_generation_stats(tmp_path):
+	rng = numpy.random.RandomState(1)
+	generations = [[(float(score), rng.uniform(-1.0, 1.0, 4)) for score in scores] for scores in ([0, 1, 2], [3, 3, 0], [5, 1, 1])]
+	writeStatsFile(tmp_path / "abc.txt", generations)
+
+	allStats = list(iterGenerationStats(str(tmp_path / "abc.txt")))
+	assert [(stats.executionId, stats.generation, stats.count, stats.maxScore) for stats in allStats] == [("abc", 0, 3, 2.0), ("abc", 1, 3, 3.0), ("abc", 2, 3, 5.0)]
+	for stats, individuals in zip(allStats, generations):
+		assert stats.getDiversity() == pytest.approx(getRmsWeightDistance(numpy.array([weights for score, weights in individuals])), rel = 1e-6)
+	assert all(stats.getDiversity() is None for stats in iterGenerationStats(str(tmp_path / "abc.txt"), False))
+
+def test_convergence_curve():
+	curve = ConvergenceCurve()
+	for executionId, scores in (("a", [[1.0, 3.0], [2.0, 4.0]]), ("b", [[0.0, 1.0]])):
+		for generation, generationScores in enumerate(scores):
+			stats = GenerationStats(executionId, generation)
+			for score in generationScores:
+				stats.add(score)
+			curve.add(stats)
+
+	rows = list(curve.iterRows())
+	assert rows == [
+		{"generation": 0, "runs": 2, "meanOfMeans": 1.25, "meanOfMaxes": 2.0, "max": 3.0, "meanRmsWeightDistance": None},
+		{"generation": 1, "runs": 1, "meanOfMeans": 3.0, "meanOfMaxes": 4.0, "max": 4.0, "meanRmsWeightDistance": None},
+	]
+
+def test_summarize_best_genomes(tmp_path):
+	with open(str(tmp_path / "bestGenomes.txt"), "w") as fh:
+		fh.write("2;a.txt;[0.5, 1.0]\n5;b.txt;[0.0, 1.0]\n\n7;a.txt;[1.0, 1.0]\n")
+	assert summarizeBestGenomes(str(tmp_path / "bestGenomes.txt")) == [
+		{"executionId": "a", "entries": 2, "bestScore": 7.0},
+		{"executionId": "b", "entries": 1, "bestScore": 5.0},
+	]
+
+def test_write_rows():
+	rows = [{"name": "a", "value": None, "histogram": {"1.0": 2, "3.0": 1}}]
+	fh = io.StringIO()
+	writeRows(rows, ["name", "value", "histogram"], "csv", fh)
+	assert fh.getvalue() == "name,value,histogram\na,,1.0:2 3.0:1\n"
+	fh = io.StringIO()
+	writeRows(rows, ["name"], "json", fh)
+	assert json.loads(fh.getvalue()) == rows[0]
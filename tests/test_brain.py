@@ -0,0 +1,48 @@
+from brain import Brain
+
+import math
+
+import numpy
+import pytest
+
+def getRandomCase(rng, topology, weightRange = 3.0):
+	"""
+	Random weights in the initial range of the genetic algorithm and random sensor
+	values, distances in [0, 1] and types in {-1, 0, 1}
+	"""
+	weights = rng.uniform(-weightRange, weightRange, Brain.getNumWeights(topology))
+	inputNumber = topology[0]//2
+	inputs = numpy.concatenate([rng.uniform(0.0, 1.0, inputNumber), rng.randint(-1, 2, topology[0] - inputNumber)])
+	return weights, inputs
+
+@pytest.mark.parametrize("topology", [(14, 12, 6, 2), (10, 16, 8, 2), (6, 2)])
+def test_float32_matches_float64(topology):
+	rng = numpy.random.RandomState(0)
+	for case in range(200):
+		weights, inputs = getRandomCase(rng, topology)
+		expected = Brain(weights, topology, 'float64').activate(inputs)
+		actual = Brain(weights, topology, 'float32').activate(inputs)
+		assert actual.dtype == numpy.float32
+		numpy.testing.assert_allclose(actual, expected, rtol = 0, atol = 1e-5)
+
+def test_pybrain_parameter_order():
+	#a 2-2-1 net: the first 4 weights are the (outputs, inputs) matrix of the first connection, row by row
+	weights = [0.1, -0.2, 0.3, 0.4, 0.5, -0.6]
+	inputs = [0.25, -1.0]
+
+	x0, x1 = math.tanh(0.25), math.tanh(-1.0) #the input layer applies tanh too
+	h0 = math.tanh(0.1*x0 - 0.2*x1)
+	h1 = math.tanh(0.3*x0 + 0.4*x1)
+	output = math.tanh(0.5*h0 - 0.6*h1)
+
+	for precision in Brain.precisions:
+		activation = Brain(weights, (2, 2, 1), precision).activate(inputs)
+		numpy.testing.assert_allclose(activation, [output], rtol = 0, atol = 1e-6 if precision == 'float32' else 1e-15)
+
+def test_wrong_number_of_weights():
+	with pytest.raises(ValueError):
+		Brain([0.0]*5, (2, 2, 1))
+
+def test_unknown_precision():
+	with pytest.raises(ValueError):
+		Brain([0.0]*6, (2, 2, 1), 'float16')
@@ -0,0 +1,78 @@
+from diversity import DiversityMonitor, getPairwiseDistance
+
+import numpy
+import pytest
+
+class Individual(object):
+	"""
+	The parameters of a PyEvolve individual
+	"""
+	def __init__(self):
+		self.params = {}
+
+	def setParams(self, **args):
+		self.params.update(args)
+
+class GA(object):
+	"""
+	The parts of GSimpleGA used by DiversityMonitor
+	"""
+	def __init__(self, individuals = 4):
+		self.internalPop = [Individual() for individual in range(individuals)]
+		self.mutationRate = None
+
+	def setMutationRate(self, rate):
+		self.mutationRate = rate
+
+diverse = numpy.random.RandomState(0).uniform(-3.0, 3.0, (4, 10))
+collapsed = numpy.tile(diverse[0], (4, 1)) + 0.01*numpy.random.RandomState(1).standard_normal((4, 10))
+
+def createMonitor(ga, patience = 0):
+	return DiversityMonitor(ga, 0.05, 1.0, 0.5, boost = 2.0, maxBoost = 8.0, patience = patience, hopelessAvgScore = 0.5)
+
+def test_pairwise_distance():
+	assert getPairwiseDistance(diverse) > 0.5 > getPairwiseDistance(collapsed)
+	assert getPairwiseDistance(diverse[:1]) == 0.0
+
+def test_threshold_triggers_the_boost():
+	ga = GA()
+	monitor = createMonitor(ga)
+	monitor.update(0, diverse, 2.0)
+	assert (monitor.mutationFactor, ga.mutationRate) == (1.0, 0.05)
+	monitor.update(1, collapsed, 2.0)
+	assert monitor.mutationFactor == 2.0 and monitor.collapsedGenerations == 1
+	assert ga.mutationRate == pytest.approx(0.1)
+	assert all(individual.params["gauss_sigma"] == 2.0 for individual in ga.internalPop)
+
+def test_boost_is_capped_and_decays():
+	ga = GA()
+	monitor = createMonitor(ga)
+	for generation in range(5):
+		monitor.update(generation, collapsed, 2.0)
+	assert [factor for generation, distance, factor in monitor.history] == [2.0, 4.0, 8.0, 8.0, 8.0]
+	assert ga.mutationRate == pytest.approx(0.4)
+
+	for generation in range(5, 10):
+		monitor.update(generation, diverse, 2.0)
+	assert [factor for generation, distance, factor in monitor.history[5:]] == [4.0, 2.0, 1.0, 1.0, 1.0]
+	assert monitor.collapsedGenerations == 0
+	assert ga.mutationRate == pytest.approx(0.05)
+	assert all(individual.params["gauss_sigma"] == 1.0 for individual in ga.internalPop)
+
+def test_hopeless_run_is_logged(tmp_path):
+	monitor = createMonitor(GA(), patience = 3)
+	assert not monitor.update(0, collapsed, 0.25)
+	assert not monitor.update(1, collapsed, 0.25)
+	assert not monitor.update(2, collapsed, 1.0) #collapsed but scoring
+	assert monitor.update(3, collapsed, 0.25)
+
+	logFilename = str(tmp_path / "hopeless.log")
+	monitor.logHopeless(logFilename, "run", 0.25)
+	monitor.logHopeless(logFilename, "run", 0.25)
+	with open(logFilename) as fh:
+		lines = fh.read().splitlines()
+	assert lines == ["run;3;" + str(round(getPairwiseDistance(collapsed), 4)) + ";0.25"]*2
+
+def test_patience_zero_never_terminates():
+	monitor = createMonitor(GA(), patience = 0)
+	assert not any(monitor.update(generation, collapsed, 0.0) for generation in range(20))
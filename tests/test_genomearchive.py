@@ -0,0 +1,79 @@
+from genomearchive import GenomeArchive
+
+import numpy
+import pytest
+
+populationSize = 4
+numWeights = 5
+
+def getGeneration(generation):
+	"""
+	Weights and scores that tell the generation and the individual apart
+	"""
+	weights = generation*100.0 + numpy.arange(populationSize*numWeights, dtype = numpy.float64).reshape(populationSize, numWeights)
+	scores = numpy.array([generation, 2.25 + generation*0.125, 0.0, generation*0.5]) #no ties among the best ones
+	return weights, scores
+
+def createArchive(tmp_path, generations, capacity):
+	archive = GenomeArchive.create(str(tmp_path / "run"), populationSize, numWeights, capacity = capacity)
+	for generation in range(generations):
+		archive.writeGeneration(generation, *getGeneration(generation))
+	return archive
+
+def test_archive_grows_by_doubling(tmp_path):
+	archive = GenomeArchive.create(str(tmp_path / "run"), populationSize, numWeights, capacity = 2)
+	capacities = []
+	for generation in range(9):
+		weights, scores = getGeneration(generation)
+		for index in range(populationSize):
+			archive.writeIndividual(generation, index, weights[index], scores[index])
+		archive.finishGeneration(generation)
+		capacities.append(archive.capacity)
+	assert capacities == [2, 2, 4, 4, 8, 8, 8, 8, 16]
+	for generation in range(9):
+		weights, scores = archive.getGeneration(generation)
+		numpy.testing.assert_array_equal(weights, getGeneration(generation)[0])
+		numpy.testing.assert_array_equal(scores, getGeneration(generation)[1])
+	archive.close()
+
+def test_reopen_an_existing_archive(tmp_path):
+	createArchive(tmp_path, 3, 2).close()
+	headerFilename = str(tmp_path / "run.archive.json")
+
+	archive = GenomeArchive.open(headerFilename)
+	assert (archive.generationNumber, archive.capacity, archive.readOnly) == (3, 4, True)
+	numpy.testing.assert_array_equal(archive.getGeneration(2)[0], getGeneration(2)[0])
+	with pytest.raises(ValueError):
+		archive.weights[0, 0, 0] = 1.0
+	archive.close()
+
+	archive = GenomeArchive.open(headerFilename, readOnly = False)
+	archive.writeGeneration(3, *getGeneration(3))
+	archive.writeGeneration(4, *getGeneration(4))
+	archive.close()
+
+	archive = GenomeArchive.open(headerFilename)
+	assert archive.generationNumber == 5
+	for generation in range(5):
+		numpy.testing.assert_array_equal(archive.getGeneration(generation)[0], getGeneration(generation)[0])
+	archive.close()
+
+def test_get_generation(tmp_path):
+	archive = createArchive(tmp_path, 3, 8)
+	weights, scores = archive.getGeneration(1)
+	assert weights.shape == (populationSize, numWeights) and scores.shape == (populationSize,)
+	assert isinstance(weights, numpy.memmap) #a view of the file, not a copy
+	numpy.testing.assert_array_equal(scores, [1.0, 2.375, 0.0, 0.5])
+	for generation in (-1, 3):
+		with pytest.raises(IndexError):
+			archive.getGeneration(generation)
+	archive.close()
+
+def test_get_top(tmp_path):
+	archive = createArchive(tmp_path, 6, 8)
+	top = archive.getTop(4)
+	assert [(score, generation, index) for score, generation, index, weights in top] == [(5.0, 5, 0), (4.0, 4, 0), (3.0, 3, 0), (2.875, 5, 1)]
+	numpy.testing.assert_array_equal(top[0][3], getGeneration(5)[0][0])
+	assert len(archive.getTop(100)) == 6*populationSize
+	assert archive.getTop(0) == []
+	archive.close()
@@ -0,0 +1,28 @@
+from genomeio import loadSeedGenomes
+from genomearchive import GenomeArchive
+from halloffame import HallOfFame
+
+import numpy
+
+def test_other_topologies_do_not_use_the_quota(tmp_path):
+	filename = str(tmp_path / "hallOfFame.db")
+	hallOfFame = HallOfFame(filename)
+	for score in range(5):
+		hallOfFame.add(10.0 + score, "other", 0, [float(score)]*3) #better, but 3 weights
+	hallOfFame.add(2.0, "run", 0, [2.0, 2.0])
+	hallOfFame.add(1.0, "run", 1, [1.0, 1.0])
+	hallOfFame.add(3.0, "run", 2, [3.0, 3.0])
+	hallOfFame.close()
+
+	assert loadSeedGenomes([filename], 2, 2) == [[3.0, 3.0], [2.0, 2.0]]
+	assert loadSeedGenomes([filename], 5, 2) == [[3.0, 3.0], [2.0, 2.0], [1.0, 1.0]]
+
+def test_archive_copies_do_not_use_the_quota(tmp_path):
+	archive = GenomeArchive.create(str(tmp_path / "run"), 3, 2, capacity = 4)
+	archive.writeGeneration(0, numpy.array([[1.0, 1.0], [2.0, 2.0], [0.0, 0.0]]), [1.0, 2.0, 0.0])
+	archive.writeGeneration(1, numpy.array([[2.0, 2.0], [2.0, 2.0], [1.0, 1.0]]), [3.0, 3.0, 1.5]) #copies of the best one
+	archive.close()
+	headerFilename = str(tmp_path / "run.archive.json")
+
+	assert loadSeedGenomes([headerFilename], 2, 2) == [[2.0, 2.0], [1.0, 1.0]]
+	assert loadSeedGenomes([headerFilename], 2, 3) == []
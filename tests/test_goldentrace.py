@@ -0,0 +1,20 @@
+from config import Config
+from goldentrace import GoldenTrace, backends, checkTrace
+
+import os
+
+import pytest
+
+traceFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "seed1.npz") #401 ticks of 8 pandas recorded from Game with seed 1
+
+@pytest.fixture(scope = "module")
+def trace():
+	return GoldenTrace.load(traceFile)
+
+@pytest.mark.parametrize("precision", ["float32", "float64"])
+def test_headless_world_follows_the_trace(trace, precision):
+	config = Config(**trace.config.toDict())
+	config.set("precision", precision)
+	result = checkTrace(trace, backends['headless'], config = config)
+	assert result['divergence'] is None
+	assert result['comparedTicks'] == len(trace)
@@ -0,0 +1,49 @@
+from halloffame import HallOfFame
+
+import multiprocessing
+
+import numpy
+
+writers = 6
+insertsPerWriter = 200
+
+def writeGenomes(filename, writer):
+	"""
+	Store distinct genomes of one writer, plus a genome shared by every writer
+	"""
+	hallOfFame = HallOfFame(filename)
+	for index in range(insertsPerWriter):
+		hallOfFame.add(float(index), "writer%d" % writer, index, [float(writer), float(index), 0.5])
+	hallOfFame.add(float(writer), "writer%d" % writer, insertsPerWriter, [1.0, 2.0, 3.0])
+	hallOfFame.close()
+
+def test_duplicate_keeps_the_highest_score(tmp_path):
+	hallOfFame = HallOfFame(str(tmp_path / "hallOfFame.db"))
+	assert hallOfFame.add(2.0, "a", 1, [0.1, 0.2])
+	assert not hallOfFame.add(5.0, "b", 7, [0.1, 0.2])
+	assert not hallOfFame.add(3.0, "c", 9, [0.1, 0.2])
+	assert hallOfFame.add(4.0, "c", 9, [0.2, 0.1])
+	assert len(hallOfFame) == 2
+
+	(score, executionId, generation, weights), second = hallOfFame.getTop(10)
+	assert (score, executionId, generation) == (5.0, "b", 7)
+	numpy.testing.assert_array_equal(weights, [0.1, 0.2])
+	assert second[0] == 4.0
+	assert [row[0] for row in hallOfFame.getTop(10, executionId = "c")] == [4.0]
+	hallOfFame.close()
+
+def test_concurrent_writers(tmp_path):
+	filename = str(tmp_path / "hallOfFame.db")
+	HallOfFame(filename).close()
+	processes = [multiprocessing.Process(target = writeGenomes, args = (filename, writer)) for writer in range(writers)]
+	for process in processes:
+		process.start()
+	for process in processes:
+		process.join()
+	assert [process.exitcode for process in processes] == [0]*writers
+
+	hallOfFame = HallOfFame(filename)
+	assert len(hallOfFame) == writers*insertsPerWriter + 1
+	score, executionId, generation, weights = hallOfFame.getTop(1, generation = insertsPerWriter)[0]
+	assert (score, executionId) == (writers - 1.0, "writer%d" % (writers - 1))
+	hallOfFame.close()
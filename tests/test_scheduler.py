@@ -0,0 +1,52 @@
+from scheduler import TickScheduler
+
+def test_events_run_at_their_tick_in_scheduling_order():
+	scheduler = TickScheduler()
+	calls = []
+	scheduler.schedule(2, calls.append, args = ("b",))
+	scheduler.schedule(1, calls.append, args = ("a",))
+	scheduler.schedule(2, calls.append, args = ("c",)) #same tick as b, runs after it
+	scheduler.schedule(0, calls.append, args = ("now",))
+	scheduler.schedule(-3, calls.append, args = ("late",)) #negative delays run as soon as possible
+	assert len(scheduler) == 5
+
+	scheduler.advance()
+	assert calls == ["now", "late", "a"]
+	assert scheduler.currentTick == 1
+	scheduler.advance()
+	assert calls == ["now", "late", "a", "b", "c"]
+	assert len(scheduler) == 0
+	scheduler.advance()
+	assert scheduler.currentTick == 3
+
+def test_delay_counts_from_the_current_tick():
+	scheduler = TickScheduler()
+	calls = []
+	scheduler.advance()
+	scheduler.advance()
+	scheduler.schedule(1, calls.append, args = (scheduler.currentTick,))
+	assert calls == []
+	scheduler.advance()
+	assert calls == [2]
+
+def test_events_scheduled_by_an_event_of_the_same_tick_run_in_that_tick():
+	scheduler = TickScheduler()
+	calls = []
+	scheduler.schedule(1, lambda: scheduler.schedule(0, calls.append, args = ("chained",)))
+	scheduler.advance()
+	assert calls == ["chained"]
+
+def test_cancel_removes_every_event_of_the_tag():
+	scheduler = TickScheduler()
+	calls = []
+	scheduler.schedule(1, calls.append, "respawn", ("a",))
+	scheduler.schedule(3, calls.append, "respawn", ("b",))
+	scheduler.schedule(2, calls.append, "remove", ("c",))
+	scheduler.schedule(1, calls.append, args = ("d",))
+	scheduler.cancel("respawn")
+	scheduler.cancel("unknown")
+	assert len(scheduler) == 2
+
+	for tick in range(3):
+		scheduler.advance()
+	assert calls == ["d", "c"]
@@ -0,0 +1,114 @@
+from selection import FitnessSelector, SteadyStateReplacement, getAverageRanks, selections
+
+import numpy
+import pytest
+
+draws = 60000
+
+class Individual(object):
+	"""
+	The score of a PyEvolve individual
+	"""
+	def __init__(self, score):
+		self.score = score
+
+class Population(object):
+	"""
+	The parts of GPopulation used by SteadyStateReplacement
+	"""
+	def __init__(self, individuals):
+		self.internalPop = individuals
+		self.evaluations = 0
+
+	def __len__(self):
+		return len(self.internalPop)
+
+	def __getitem__(self, index):
+		return self.internalPop[index]
+
+	def evaluate(self):
+		self.evaluations += 1
+
+	def clearFlags(self):
+		pass
+
+class GA(object):
+	"""
+	The parts of GSimpleGA used by SteadyStateReplacement, each step replaces the
+	whole population with offspring of score -1
+	"""
+	def __init__(self, scores):
+		self.internalPop = Population([Individual(score) for score in scores])
+
+	def step(self):
+		self.internalPop.internalPop = [Individual(-1) for individual in self.internalPop.internalPop]
+
+def getFrequencies(name, fitness, **options):
+	"""
+	Fraction of the draws of a selection that picked each individual
+	"""
+	indices = selections[name](numpy.random.RandomState(0), numpy.array(fitness, dtype = numpy.float64), draws, **options)
+	return numpy.bincount(indices, minlength = len(fitness))/float(draws)
+
+@pytest.mark.parametrize("name", sorted(selections))
+def test_tied_scores_are_equally_likely(name):
+	fitness = [3, 1, 3, 0, 3, 2, 1, 3]
+	frequencies = getFrequencies(name, fitness)
+	for score in set(fitness):
+		tied = frequencies[[index for index, value in enumerate(fitness) if value == score]]
+		numpy.testing.assert_allclose(tied, tied.mean(), rtol = 0, atol = 0.01)
+
+def test_average_ranks():
+	numpy.testing.assert_array_equal(getAverageRanks(numpy.array([2.0, 5.0, 2.0, 0.0, 2.0])), [2.0, 4.0, 2.0, 0.0, 2.0])
+	numpy.testing.assert_array_equal(getAverageRanks(numpy.array([1.0, 4.0, 3.0])), [0.0, 2.0, 1.0])
+
+def test_rank_weights():
+	fitness = [2, 5, 2, 0]
+	ranks = numpy.array([1.5, 3.0, 1.5, 0.0])
+	expected = (2.0 - 1.7) + 2.0*0.7*ranks/3.0 #1.7 times the average for the best, 0.3 for the worst
+	numpy.testing.assert_allclose(getFrequencies('rank', fitness, pressure = 1.7), expected/expected.sum(), rtol = 0, atol = 0.01)
+	numpy.testing.assert_allclose(getFrequencies('rank', fitness, pressure = 1.0), [0.25]*4, rtol = 0, atol = 0.01)
+
+def test_truncation_cut():
+	#the 3 best places: the 5 and two of the three 3s
+	frequencies = getFrequencies('truncation', [3, 0, 5, 3, 1, 3], fraction = 0.5)
+	numpy.testing.assert_allclose(frequencies, [2/9.0, 0.0, 1/3.0, 2/9.0, 0.0, 2/9.0], rtol = 0, atol = 0.01)
+	assert frequencies[1] == frequencies[4] == 0.0
+
+	frequencies = getFrequencies('truncation', [4, 2, 3, 1], fraction = 0.5)
+	numpy.testing.assert_allclose(frequencies, [0.5, 0.0, 0.5, 0.0], rtol = 0, atol = 0.01)
+
+def test_fitness_selector_draws_once_per_generation():
+	calls = []
+	def selection(rng, fitness, count):
+		calls.append(count)
+		return numpy.arange(count) % len(fitness)
+
+	selector = FitnessSelector('rank', numpy.random.RandomState(0))
+	selector.selection = selection
+	for individuals in (5, 6):
+		population = [Individual(score) for score in range(individuals)]
+		del calls[:]
+		count = individuals + individuals % 2 + 1
+		selected = [selector(population, popID = individuals) for parent in range(count)]
+		assert calls == [count]
+		assert [individual.score for individual in selected] == [parent % individuals for parent in range(count)]
+
+	with pytest.raises(RuntimeError): #every parent of the generation was returned
+		selector(population, popID = 6)
+	selector(population, popID = 7)
+	assert calls == [7, 7] #a new generation
+	selector(population, popID = 8)
+	assert calls == [7, 7, 7] #a new generation before every parent was returned
+
+def test_steady_state_keeps_the_best():
+	ga = GA([2, 7, 0, 5, 5, 1])
+	SteadyStateReplacement(2).step(ga)
+	assert ga.internalPop.evaluations == 1
+	assert [individual.score for individual in ga.internalPop] == [7, 5, 5, 2, -1, -1]
+
+@pytest.mark.parametrize("replaceNumber", [0, 6])
+def test_generational_replacement(replaceNumber):
+	ga = GA([2, 7, 0, 5, 5, 1])
+	SteadyStateReplacement(replaceNumber).step(ga)
+	assert [individual.score for individual in ga.internalPop] == [-1]*6
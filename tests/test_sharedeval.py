@@ -0,0 +1,39 @@
+from config import Config
+from sharedeval import SharedEvaluator, getArraySpecs, getArrayViews, getBufferSize
+
+import random
+
+import numpy
+
+def evaluate(config, genomes, jobs):
+	"""
+	Results of two generations evaluated in 3 worlds with a number of processes
+	"""
+	evaluator = SharedEvaluator(config, 3, jobs)
+	try:
+		rng = random.Random(5)
+		return [evaluator.evaluate(genomes, rng) for generation in range(2)]
+	finally:
+		evaluator.close()
+
+def test_processes_do_not_change_the_results():
+	config = Config(headless = True, maxFramesPerGeneration = 200, pandaNumber = 4)
+	genomes = numpy.random.RandomState(0).uniform(-3.0, 3.0, (config.pandaNumber, config.numNeurons))
+	serial = evaluate(config, genomes, 1)
+	parallel = evaluate(config, genomes, 3)
+	assert sum(carrotsEaten.sum() for carrotsEaten, survived in serial) > 0
+	for (serialCarrots, serialSurvived), (parallelCarrots, parallelSurvived) in zip(serial, parallel):
+		assert serialCarrots.shape == (3, config.pandaNumber)
+		numpy.testing.assert_array_equal(parallelCarrots, serialCarrots)
+		numpy.testing.assert_array_equal(parallelSurvived, serialSurvived)
+
+def test_array_views_are_aligned_and_disjoint():
+	config = Config(headless = True, pandaNumber = 3, spikeNumber = 1, carrotNumber = 5)
+	specs = getArraySpecs(config, 3)
+	buffer = bytearray(getBufferSize(specs))
+	arrays = getArrayViews(buffer, specs)
+	for name, shape, dtype in specs:
+		assert arrays[name].shape == shape
+		assert arrays[name].ctypes.data % 8 == 0
+		arrays[name][...] = 1
+	assert all((array == 1).all() for array in arrays.values()) #no array overwrote another one
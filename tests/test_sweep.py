@@ -0,0 +1,78 @@
+from sweep import Sweep, expandGrid
+
+import os
+
+import pytest
+
+sweepOptions = {"base": {"maxGenerations": 4, "seed": 10}, "grid": {"mutationRate": [0.01, 0.05], "pandaNumber": [8, 16]}, "repeats": 2}
+
+def writeStats(directory, runId, generations):
+	"""
+	A stats file of a run, each line is "generation;score;[weights]"
+	"""
+	with open(os.path.join(directory, "stats", runId + ".txt"), "w") as fh:
+		for generation, scores in enumerate(generations):
+			for score in scores:
+				fh.write("%d;%s;[0.0, 1.0]\n" % (generation, score))
+
+def markDone(directory, runId):
+	open(os.path.join(directory, "runs", runId + ".done"), "w").close()
+
+def test_expand_grid():
+	runs = expandGrid(sweepOptions)
+	assert len(runs) == 8
+	assert len(set(runId for runId, options in runs)) == 8
+	assert runs == expandGrid(sweepOptions) #the ids do not change when the sweep is resumed
+	assert [(options["mutationRate"], options["pandaNumber"], options["seed"]) for runId, options in runs] == [
+		(0.01, 8, 10), (0.01, 8, 11), (0.01, 16, 10), (0.01, 16, 11),
+		(0.05, 8, 10), (0.05, 8, 11), (0.05, 16, 10), (0.05, 16, 11),
+	]
+	assert all(options["maxGenerations"] == 4 for runId, options in runs)
+
+def test_expand_grid_without_seed():
+	runs = expandGrid({"grid": {"pandaNumber": [8]}, "repeats": 3})
+	assert len(set(runId for runId, options in runs)) == 3
+	assert all("seed" not in options for runId, options in runs) #random worlds
+
+def test_expand_grid_checks_the_options():
+	with pytest.raises(KeyError):
+		expandGrid({"grid": {"pandaNumbers": [8]}})
+	with pytest.raises(ValueError):
+		expandGrid({"grid": {"pandaNumber": [0]}})
+
+def test_resume_and_summary(tmp_path):
+	directory = str(tmp_path / "sweep")
+	sweep = Sweep(directory, sweepOptions, jobs = 1)
+	runIds = [runId for runId, options in sweep.runs]
+	assert sweep.getPendingRuns() == sweep.runs
+
+	writeStats(directory, runIds[0], [[0, 3], [4, 2], [1, 1]])
+	writeStats(directory, runIds[1], [[5, 1]])
+	writeStats(directory, runIds[2], [[9, 9]]) #stats of an incomplete run
+	markDone(directory, runIds[0])
+	markDone(directory, runIds[1])
+	for runId in runIds[3:]:
+		markDone(directory, runId) #done without stats, it is not summarized
+
+	resumed = Sweep(directory, sweepOptions, jobs = 1)
+	assert resumed.getPendingRuns() == [sweep.runs[2]]
+
+	resumed.writeSummary()
+	with open(os.path.join(directory, "summary.csv")) as fh:
+		lines = fh.read().splitlines()
+	assert lines == [
+		"runId,mutationRate,pandaNumber,generations,bestScore,firstAvgScore,bestAvgScore,lastAvgScore",
+		runIds[0] + ",0.01,8,3,4.0,1.5,3.0,1.0",
+		runIds[1] + ",0.01,8,1,5.0,3.0,3.0,3.0",
+	]
+
+def test_finished_sweep_only_writes_the_summary(tmp_path):
+	directory = str(tmp_path / "sweep")
+	sweep = Sweep(directory, {"grid": {"pandaNumber": [8]}}, jobs = 1)
+	runId = sweep.runs[0][0]
+	writeStats(directory, runId, [[1, 2]])
+	markDone(directory, runId)
+	assert sweep.run(pollInterval = 0) == 0
+	assert os.listdir(os.path.join(directory, "runs")) == [runId + ".done"] #nothing was launched
+	with open(os.path.join(directory, "summary.csv")) as fh:
+		assert fh.read().splitlines()[1] == runId + ",8,1,2.0,1.5,1.5,1.5"
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("pyevolve")
+
+from warmstart import WarmStartInitializator
+
+import random
+
+class Genome(object):
+	"""
+	The parts of G1DList used by WarmStartInitializator
+	"""
+	def __init__(self):
+		self.genomeList = []
+
+	def getParam(self, key, nvl = None):
+		return {"rangemin": -3.0, "rangemax": 3.0}.get(key, nvl)
+
+def initialize(seed):
+	initializator = WarmStartInitializator([[0.5, -0.5, 2.9], [1.0, 1.0, 1.0]], 4, 0.5, 0.2, random.Random(seed))
+	genomes = [Genome() for individual in range(2)]
+	for genome in genomes:
+		initializator(genome)
+	return [genome.genomeList for genome in genomes]
+
+def test_jitter_is_reproducible():
+	assert initialize(7) == initialize(7)
+	assert initialize(7) != initialize(8)
+	assert all(-3.0 <= weight <= 3.0 for genomeList in initialize(7) for weight in genomeList)
@@ -0,0 +1,65 @@
+from config import Config
+from world import HeadlessWorld
+
+import random
+
+import numpy
+import pytest
+
+def getStillGenome(config):
+	"""
+	Zero weights, the net outputs no turn and half speed, 1 unit per tick
+	"""
+	return numpy.zeros(config.numNeurons)
+
+@pytest.mark.parametrize("seed", [24, 33, 39]) #seeds where the panda eats carrots, and dies in two of them
+def test_one_batched_panda_follows_the_per_frame_rules(seed):
+	#with a single panda there is no other panda to eat a carrot in the middle of the tick
+	genomes = list(numpy.random.RandomState(seed).uniform(-3.0, 3.0, (1, Config().numNeurons)))
+	worlds = []
+	for batchPandas in (False, True):
+		world = HeadlessWorld(Config(headless = True, maxFramesPerGeneration = 300, precision = "float64", batchPandas = batchPandas), genomes, random.Random(seed))
+		world.run()
+		worlds.append(world)
+	perFrame, batched = worlds
+	assert perFrame.carrotsEaten[0] >= 3
+	assert perFrame.frameNumber == batched.frameNumber
+	numpy.testing.assert_allclose(batched.pandaPositions, perFrame.pandaPositions, rtol = 0, atol = 1e-6)
+	numpy.testing.assert_array_equal(batched.carrotsEaten, perFrame.carrotsEaten)
+	numpy.testing.assert_array_equal(batched.isDying, perFrame.isDying)
+
+def test_swept_contacts():
+	starts = numpy.array([[0.0, 0.0], [0.0, 0.0]])
+	ends = numpy.array([[2.5, 0.0], [0.0, 0.0]])
+	objects = numpy.array([[3.0, 0.0], [1.0, 1.0], [9.0, 9.0]])
+	times = HeadlessWorld.getSweptContacts(starts, ends, objects, 1.0)
+	numpy.testing.assert_allclose(times[0], [0.8, numpy.inf, numpy.inf]) #the second one is only grazed
+	numpy.testing.assert_allclose(times[1], [numpy.inf, numpy.inf, numpy.inf]) #not moving, out of reach
+	times = HeadlessWorld.getSweptContacts(starts, ends, objects, 4.0)
+	numpy.testing.assert_allclose(times[0], [0.4, 0.0, numpy.inf]) #the second one is in reach from the start
+	numpy.testing.assert_allclose(times[1], [numpy.inf, 0.0, numpy.inf])
+
+def test_long_step_does_not_tunnel():
+	#8 units in one step, the carrot is 4 units from the end, out of reach of the endpoint test
+	config = Config(headless = True, ticksPerStep = 8)
+	world = HeadlessWorld(config, [getStillGenome(config)], scenario = ([], [(50.0, 50.0, 0.0)], [(50.0, 46.0)]))
+	world.step()
+	numpy.testing.assert_allclose(world.pandaPositions[0], [50.0, 42.0])
+	assert world.carrotsEaten[0] == 1 and not world.carrotActive[0]
+	assert world.frameNumber == 8
+
+def test_long_step_events_happen_at_their_tick():
+	#the panda touches the spike on its second tick, its removal is scheduled at the same tick as per frame
+	removalTicks = []
+	for ticksPerStep in (1, 8):
+		config = Config(headless = True, ticksPerStep = ticksPerStep)
+		world = HeadlessWorld(config, [getStillGenome(config)], scenario = ([(50.0, 44.0)], [(50.0, 50.0, 0.0)], []))
+		while not world.isDying[0]:
+			world.step()
+		removalTicks.append(world.scheduler.events[0][0])
+	assert removalTicks[0] == removalTicks[1] == 2 + config.dyingTicks
+
+@pytest.mark.parametrize("baseSpeed", [0.0, 1.6])
+def test_base_speed_can_not_step_over_a_carrot(baseSpeed):
+	with pytest.raises(ValueError):
+		Config(baseSpeed = baseSpeed)
@@ -0,0 +1,53 @@
+from pyevolve import Initializators
+
+import random
+
+class WarmStartInitializator(object):
+	"""
+	PyEvolve initializator that copies stored genomes into the first individuals
+	of the population and initializes the rest with G1DListInitializatorReal
+
+	Attributes:
+	    seedGenomes (list): Weights of the genomes used as seeds, best first
+	    seedNumber (int): Number of individuals initialized from the seeds
+	    jitterSigma (float): Standard deviation of the gaussian noise added to the seeds
+	    rng (random.Random): Random number generator of the noise
+	    initializedNumber (int): Number of individuals initialized so far
+
+	"""
+	def __init__(self, seedGenomes, populationSize, fraction, jitterSigma = 0.0, rng = None):
+		"""
+		Initialize
+
+		Args:
+		    seedGenomes (list): Weights of the genomes used as seeds, best first
+		    populationSize (int): Number of individuals of the population
+		    fraction (float): Fraction of the population initialized from the seeds
+		    jitterSigma (float, optional): Standard deviation of the gaussian noise added to the seeds
+		    rng (random.Random, optional): Random number generator of the noise, a new unseeded one if None
+		"""
+		self.seedGenomes = seedGenomes
+		self.seedNumber = min(len(seedGenomes), int(round(fraction*populationSize)))
+		self.jitterSigma = jitterSigma
+		self.rng = rng if rng is not None else random.Random()
+		self.initializedNumber = 0
+
+	def __call__(self, genome, **args):
+		"""
+		PyEvolve's initializator function, it is called once per individual
+
+		Args:
+		    genome (G1DList): PyEvolve's individual container
+		    **args: PyEvolve's extra arguments
+		"""
+		if self.initializedNumber < self.seedNumber:
+			rangemin = genome.getParam("rangemin", 0)
+			rangemax = genome.getParam("rangemax", 100)
+			weights = self.seedGenomes[self.initializedNumber]
+			if self.jitterSigma > 0.0:
+				weights = [min(rangemax, max(rangemin, weight + self.rng.gauss(0.0, self.jitterSigma))) for weight in weights]
+			genome.genomeList = list(weights)
+		else:
+			Initializators.G1DListInitializatorReal(genome, **args)
+
+		self.initializedNumber += 1
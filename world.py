@@ -0,0 +1,420 @@
+from math import sin, cos, tan, radians, ceil
+
+from brain import Brain
+from scheduler import TickScheduler
+import layout
+
+import random
+
+import numpy
+
+class HeadlessWorld(object):
+	"""
+	A generation of the simulation without Panda3D. It follows the rules of Game,
+	Panda and Carrot tick by tick: the same placement code, sensors, network,
+	movement, collisions and scheduled events, but the view frustums are tested
+	analytically and the world is kept in numpy arrays.
+
+	Attributes:
+	    config (Config): Options of the run
+	    dtype (numpy.dtype): Floating point type of the sensors and the networks
+	    rng (random.Random): Random number generator of the positions
+	    scheduler (TickScheduler): Delayed events, in simulation ticks
+	    frameNumber (int): Number of ticks simulated
+	    brains (list): Brain of each panda
+	    pandaPositions (numpy.ndarray): (pandas, 2) x and y of each panda
+	    pandaHeadings (numpy.ndarray): Heading of each panda in degrees
+	    health (numpy.ndarray): Health of each panda
+	    carrotsEaten (numpy.ndarray): Score of each panda
+	    isDying (numpy.ndarray): True for the pandas that died
+	    isAlive (numpy.ndarray): False for the pandas that were removed
+	    livingPandas (int): Number of pandas not removed
+	    carrotPositions (numpy.ndarray): (carrots, 2) x and y of each carrot
+	    carrotActive (numpy.ndarray): True for the carrots that can be eaten
+	    spikePositions (numpy.ndarray): (spikes, 2) x and y of the wall and normal spikes
+	    brainInputs (numpy.ndarray): (pandas, 2*frustums) last sensor values of each panda
+	    brainOutputs (numpy.ndarray): (pandas, 2) last network outputs of each panda
+	    weightStacks (list): (pandas, outputs, inputs) weights of each layer of every net
+	    frustumBasis (numpy.ndarray): (frustums, 3, 3) forward, right and up vectors of each frustum
+	    tanHalfFov (tuple): Tangent of half the horizontal and vertical field of view
+
+	"""
+	vfov = 10.0
+	near = 0.01
+
+	def __init__(self, config, genomes, rng = None, scenario = None):
+		"""
+		Initialize
+
+		Args:
+		    config (Config): Options of the run, pandaNumber is replaced by the number of genomes
+		    genomes (list): Weights of the net of each panda
+		    rng (random.Random, optional): Random number generator, a new one seeded with config.seed if None
+		    scenario (tuple, optional): (spikes, pandas, carrots) as returned by layout.generateLayout, generated with rng if None
+		"""
+		self.config = config
+		self.dtype = Brain.getDtype(config.getPrecision())
+		self.rng = rng if rng is not None else random.Random(config.seed if config.seed else None)
+		self.scheduler = TickScheduler()
+		self.frameNumber = 0
+
+		if scenario is None:
+			scenario = layout.generateLayout(self.rng, config.gameWidth, config.gameHeight, config.spikeNumber, len(genomes), config.carrotNumber)
+		spikes, pandas, carrots = scenario
+
+		self.brains = [Brain(weights, config.topology, config.getPrecision()) for weights in genomes]
+		pandaNumber = len(self.brains)
+		self.weightStacks = [numpy.array([brain.weightMatrices[layer] for brain in self.brains], dtype = self.dtype) for layer in range(len(config.topology) - 1)]
+		self.pandaPositions = numpy.array([(x, y) for x, y, h in pandas], dtype = numpy.float64).reshape(pandaNumber, 2)
+		self.pandaHeadings = numpy.array([h for x, y, h in pandas], dtype = numpy.float64)
+		self.health = numpy.full(pandaNumber, 100.0)
+		self.carrotsEaten = numpy.zeros(pandaNumber, dtype = int)
+		self.isDying = numpy.zeros(pandaNumber, dtype = bool)
+		self.isAlive = numpy.ones(pandaNumber, dtype = bool)
+		self.livingPandas = pandaNumber
+
+		self.carrotPositions = numpy.array(carrots, dtype = numpy.float64).reshape(-1, 2)
+		self.carrotActive = numpy.ones(len(self.carrotPositions), dtype = bool)
+		self.spikePositions = numpy.array(layout.getWallSpikePositions(config.gameWidth, config.gameHeight) + list(spikes), dtype = numpy.float64).reshape(-1, 2)
+
+		self.brainInputs = numpy.zeros((pandaNumber, config.frustumNumber*2), dtype = self.dtype)
+		self.brainOutputs = numpy.zeros((pandaNumber, 2), dtype = self.dtype)
+		self.__setUpFrustums()
+
+	def __setUpFrustums(self):
+		"""
+		Compute the axes of the view frustums, like Panda.__setUpLens does with PerspectiveLens
+		"""
+		frustumNumber = self.config.frustumNumber
+		hfov = 180.0 / frustumNumber
+		delta = radians(180.0 - (90 + HeadlessWorld.vfov/2))
+		hfovRad = radians(hfov)
+
+		self.frustumBasis = numpy.zeros((frustumNumber, 3, 3))
+		for k, i in enumerate(range(1, frustumNumber*2, 2)):
+			forward = numpy.array([cos(hfovRad*i/2), -sin(hfovRad*i/2), cos(delta)])
+			forward /= numpy.linalg.norm(forward)
+			right = numpy.cross(forward, [0.0, 0.0, 1.0])
+			right /= numpy.linalg.norm(right)
+			self.frustumBasis[k] = (forward, right, numpy.cross(right, forward))
+		self.tanHalfFov = (tan(radians(hfov/2)), tan(radians(HeadlessWorld.vfov/2)))
+
+	def __getClosestInView(self, indices, positions):
+		"""
+		Distance to the closest object inside each view frustum of some pandas
+
+		Args:
+		    indices (numpy.ndarray): Indices of the pandas
+		    positions (numpy.ndarray): (objects, 2) x and y of the objects
+
+		Returns:
+		    numpy.ndarray: (pandas, frustums) distances, inf if there is nothing in view
+		"""
+		if not len(positions):
+			return numpy.full((len(indices), self.config.frustumNumber), numpy.inf)
+
+		headings = numpy.radians(self.pandaHeadings[indices])[:, numpy.newaxis]
+		delta = positions[numpy.newaxis, :, :] - self.pandaPositions[indices][:, numpy.newaxis, :]
+		local = numpy.empty((len(indices), len(positions), 3))
+		local[:, :, 0] = delta[:, :, 0]*numpy.cos(headings) + delta[:, :, 1]*numpy.sin(headings)
+		local[:, :, 1] = -delta[:, :, 0]*numpy.sin(headings) + delta[:, :, 1]*numpy.cos(headings)
+		local[:, :, 2] = 0.01 #Panda tests the points at this height in the frame of the lens
+
+		projected = numpy.matmul(local, self.frustumBasis.reshape(-1, 3).T).reshape(len(indices), len(positions), -1, 3) #(pandas, objects, frustums, forward/right/up)
+		depth = projected[:, :, :, 0]
+		inView = (depth >= HeadlessWorld.near) & (depth <= self.config.viewDistance)
+		inView &= numpy.abs(projected[:, :, :, 1]) <= depth*self.tanHalfFov[0]
+		inView &= numpy.abs(projected[:, :, :, 2]) <= depth*self.tanHalfFov[1]
+
+		distances = numpy.hypot(local[:, :, 0], local[:, :, 1])[:, :, numpy.newaxis]
+		return numpy.where(inView, distances, numpy.inf).min(axis = 1)
+
+	def updateInputs(self, indices):
+		"""
+		Update the inputs of the neural networks of some pandas, like Panda.__updateInputs
+
+		Args:
+		    indices (numpy.ndarray): Indices of the pandas
+		"""
+		frustumNumber = self.config.frustumNumber
+		carrotDistances = self.__getClosestInView(indices, self.carrotPositions[self.carrotActive])
+		spikeDistances = self.__getClosestInView(indices, self.spikePositions)
+
+		types = numpy.where(spikeDistances < carrotDistances, -1, numpy.where(numpy.isfinite(carrotDistances), 1, 0))
+		distances = numpy.minimum(numpy.minimum(carrotDistances, spikeDistances), self.config.viewDistance)
+
+		self.brainInputs[indices, :frustumNumber] = distances/self.config.viewDistance
+		self.brainInputs[indices, frustumNumber:] = types
+
+	def updatePanda(self, index):
+		"""
+		One tick of a panda, like Panda.update
+
+		Args:
+		    index (int): Index of the panda
+		"""
+		if self.isDying[index]:
+			return
+
+		self.updateInputs([index])
+		self.brainOutputs[index] = self.brains[index].activate(self.brainInputs[index])
+		turn, speed = self.brainOutputs[index].tolist()
+
+		self.pandaHeadings[index] += turn*self.config.baseTurnSpeed
+		heading = radians(self.pandaHeadings[index])
+		step = (speed + 1.0)*self.config.baseSpeed
+		self.pandaPositions[index, 0] += step*sin(heading)
+		self.pandaPositions[index, 1] -= step*cos(heading)
+
+		self.handleCollisions(index)
+		self.health[index] -= 0.2
+
+		if self.health[index] <= 0.0:
+			self.__die(index)
+
+	def activateBrains(self, indices):
+		"""
+		Run the networks of some pandas at once, with the weights of every panda
+		stacked layer by layer
+
+		Args:
+		    indices (numpy.ndarray): Indices of the pandas
+		"""
+		activation = numpy.tanh(self.brainInputs[indices])
+		for weights in self.weightStacks:
+			activation = numpy.tanh(numpy.einsum('poi,pi->po', weights[indices], activation))
+		self.brainOutputs[indices] = activation
+
+	def updateBatch(self):
+		"""
+		One tick where every living panda is updated at once: the sensors and the
+		nets of all of them, then their moves and collisions in order. It follows
+		the per frame rules, except that every panda senses the world as it was at
+		the start of the tick instead of after the moves of the pandas before it
+		"""
+		indices = numpy.flatnonzero(~self.isDying)
+		if not len(indices):
+			return
+
+		self.updateInputs(indices)
+		self.activateBrains(indices)
+		outputs = self.brainOutputs[indices].astype(numpy.float64)
+
+		self.pandaHeadings[indices] += outputs[:, 0]*self.config.baseTurnSpeed
+		headings = numpy.radians(self.pandaHeadings[indices])
+		steps = (outputs[:, 1] + 1.0)*self.config.baseSpeed
+		self.pandaPositions[indices, 0] += steps*numpy.sin(headings)
+		self.pandaPositions[indices, 1] -= steps*numpy.cos(headings)
+
+		for index in indices:
+			self.handleCollisions(index)
+		self.health[indices] -= 0.2
+		for index in indices[self.health[indices] <= 0.0]:
+			self.__die(index)
+
+	@staticmethod
+	def getSweptContacts(starts, ends, positions, radiusSquared):
+		"""
+		First moment each moving point comes closer than a radius to each object
+		during a move, solving |start + t*(end - start) - object|^2 = radius^2
+
+		Args:
+		    starts (numpy.ndarray): (points, 2) positions at the start of the move
+		    ends (numpy.ndarray): (points, 2) positions at the end of the move
+		    positions (numpy.ndarray): (objects, 2) x and y of the objects
+		    radiusSquared (float): Squared contact distance
+
+		Returns:
+		    numpy.ndarray: (points, objects) fraction of the move of each contact, inf if there is none
+		"""
+		directions = ends - starts
+		offsets = starts[:, numpy.newaxis, :] - positions[numpy.newaxis, :, :] #(points, objects, 2)
+		a = (directions**2).sum(axis = 1)[:, numpy.newaxis]
+		b = 2.0*numpy.einsum('pc,poc->po', directions, offsets)
+		c = (offsets**2).sum(axis = 2) - radiusSquared
+		discriminant = b*b - 4.0*a*c
+
+		with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+			root = numpy.sqrt(numpy.maximum(discriminant, 0.0))
+			entry = (-b - root)/(2.0*a)
+			exit = (-b + root)/(2.0*a)
+		moving = a > 0.0
+		touching = numpy.where(moving, (discriminant > 0.0) & (exit > 0.0) & (entry < 1.0), c < 0.0)
+		return numpy.where(touching, numpy.where(moving, numpy.maximum(entry, 0.0), 0.0), numpy.inf)
+
+	def updateLongStep(self, ticks):
+		"""
+		Several ticks at once with one decision: every living panda senses and runs
+		its net at the start of the step, turns the turn of all the ticks and moves
+		the distance of all the ticks in a straight line. The carrots and spikes
+		touched along the path are found with a swept circle test and resolved in
+		the order they are touched, and the health lost, deaths and respawns happen
+		at the tick of the step they belong to
+
+		Args:
+		    ticks (int): Number of ticks of the step, the events of the first one already ran
+		"""
+		indices = numpy.flatnonzero(~self.isDying)
+		if len(indices):
+			self.updateInputs(indices)
+			self.activateBrains(indices)
+			outputs = self.brainOutputs[indices].astype(numpy.float64)
+
+			self.pandaHeadings[indices] += outputs[:, 0]*self.config.baseTurnSpeed*ticks
+			headings = numpy.radians(self.pandaHeadings[indices])
+			steps = (outputs[:, 1] + 1.0)*self.config.baseSpeed*ticks
+			starts = self.pandaPositions[indices]
+			ends = numpy.column_stack((starts[:, 0] + steps*numpy.sin(headings), starts[:, 1] - steps*numpy.cos(headings)))
+			self.pandaPositions[indices] = ends
+
+			spikeTimes = self.getSweptContacts(starts, ends, self.spikePositions, 20).min(axis = 1, initial = numpy.inf)
+			carrotTimes = self.getSweptContacts(starts, ends, self.carrotPositions, 10)
+			carrotTimes[:, ~self.carrotActive] = numpy.inf
+
+			contacts = [(spikeTimes[row], row, 1, None) for row in numpy.flatnonzero(numpy.isfinite(spikeTimes))]
+			contacts += [(carrotTimes[row, carrot], row, 0, carrot) for row, carrot in zip(*numpy.nonzero(numpy.isfinite(carrotTimes)))]
+			elapsed = numpy.zeros(len(indices), dtype = int) #ticks of health already lost by each panda
+			for time, row, isSpike, carrot in sorted(contacts): #the carrot first when it is touched with a spike, like the per frame rules
+				index = indices[row]
+				tick = min(int(time*ticks), ticks - 1)
+				self.__loseHealth(index, tick - elapsed[row], elapsed[row])
+				elapsed[row] = tick
+				if self.isDying[index]:
+					continue
+				if isSpike:
+					self.__die(index, tick)
+				elif self.carrotActive[carrot]:
+					self.__eatCarrot(index, carrot, tick)
+			for row, index in enumerate(indices):
+				self.__loseHealth(index, ticks - elapsed[row], elapsed[row])
+
+		for tick in range(1, ticks):
+			self.scheduler.advance()
+
+	def __loseHealth(self, index, ticks, firstTick):
+		"""
+		Health lost by a panda in some ticks of a long step, it dies at the tick its
+		health reaches 0
+
+		Args:
+		    index (int): Index of the panda
+		    ticks (int): Number of ticks
+		    firstTick (int): Tick of the step where they start
+		"""
+		if self.isDying[index] or ticks <= 0:
+			return
+		health = self.health[index]
+		self.health[index] -= 0.2*ticks
+		if self.health[index] <= 0.0:
+			self.__die(index, firstTick + min(ticks, int(ceil(health/0.2))) - 1)
+
+	def handleCollisions(self, index):
+		"""
+		Eat the first active carrot in reach, die when touching a spike, like Panda.__handleCollisions
+
+		Args:
+		    index (int): Index of the panda
+		"""
+		position = self.pandaPositions[index]
+		carrotDistances = ((self.carrotPositions - position)**2).sum(axis = 1)
+		reachable = numpy.flatnonzero(self.carrotActive & (carrotDistances < 10))
+		if len(reachable):
+			self.__eatCarrot(index, reachable[0])
+
+		if (((self.spikePositions - position)**2).sum(axis = 1) < 20).any():
+			self.__die(index)
+
+	def __eatCarrot(self, index, carrot, tick = 0):
+		"""
+		Increment score and life points, and send the carrot to respawn
+
+		Args:
+		    index (int): Index of the panda
+		    carrot (int): Index of the carrot
+		    tick (int, optional): Tick of the current step where it is eaten
+		"""
+		self.carrotsEaten[index] += 1
+		self.health[index] = min(100.0, self.health[index] + 40.0)
+		self.carrotActive[carrot] = False
+		self.scheduler.schedule(self.config.carrotRespawnTicks + tick, self.__repositionCarrot, 'reset carrot', [carrot])
+
+	def __repositionCarrot(self, carrot):
+		"""
+		Move an eaten carrot to a free position, like Carrot.reposition
+
+		Args:
+		    carrot (int): Index of the carrot
+		"""
+		pandas = [tuple(position) for position in self.pandaPositions[~self.isDying].tolist()]
+		spikes = [tuple(position) for position in self.spikePositions.tolist()]
+		carrots = [tuple(position) for position in self.carrotPositions[self.carrotActive].tolist()]
+		self.carrotPositions[carrot] = layout.findCarrotPosition(self.rng, self.config.gameWidth, self.config.gameHeight, pandas, spikes, carrots)
+		self.carrotActive[carrot] = True
+
+	def __die(self, index, tick = 0):
+		"""
+		Kill a panda, it is removed later
+
+		Args:
+		    index (int): Index of the panda
+		    tick (int, optional): Tick of the current step where it dies
+		"""
+		if not self.isDying[index]:
+			self.health[index] = 0.0
+			self.isDying[index] = True
+			self.scheduler.schedule(self.config.dyingTicks + tick, self.__delete, 'delete panda', [index])
+
+	def __delete(self, index):
+		"""
+		Remove a dead panda
+
+		Args:
+		    index (int): Index of the panda
+		"""
+		self.isAlive[index] = False
+		self.livingPandas -= 1
+
+	def isFinished(self):
+		"""
+		Returns True when the generation is over, like Game.__logicLoop
+
+		Returns:
+		    bool: True if the frames are over or all the pandas were removed
+		"""
+		return self.frameNumber > self.config.maxFramesPerGeneration or self.livingPandas == 0
+
+	def step(self):
+		"""
+		Simulate a tick, like Game.__logicLoop, or ticksPerStep ticks with one decision
+		when it is above 1, fewer if the generation ends before
+		"""
+		ticks = min(self.config.ticksPerStep, self.config.maxFramesPerGeneration + 1 - self.frameNumber)
+		self.scheduler.advance()
+		if ticks > 1:
+			self.updateLongStep(ticks)
+		elif self.config.batchPandas:
+			self.updateBatch()
+		else:
+			for index in range(len(self.brains)):
+				self.updatePanda(index)
+		self.frameNumber += ticks
+
+	def run(self):
+		"""
+		Simulate until the generation is over
+
+		Returns:
+		    numpy.ndarray: Number of carrots eaten by each panda
+		"""
+		while not self.isFinished():
+			self.step()
+		return self.carrotsEaten
+
+	def getScores(self):
+		"""
+		Returns the fitness of each panda, like Panda.getScoreById
+
+		Returns:
+		    numpy.ndarray: Carrots eaten plus 3 if the panda did not die
+		"""
+		return self.carrotsEaten + 3*(~self.isDying)